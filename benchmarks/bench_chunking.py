@@ -0,0 +1,145 @@
+#!/usr/bin/env python3
+"""
+Chunking benchmark
+Compares the single-pass token-offset chunker against the previous
+count-every-section/sentence implementation on a synthetic 3-hour transcript,
+then reports chunk count and fill for greedy and optimal packing
+
+Usage: python benchmarks/bench_chunking.py [--runs N]
+"""
+
+import argparse
+import random
+import re
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from src.config import Config
+from src.processors.text_processor import TextProcessor
+
+# Chunk size used by the legacy chunker's configuration
+CHUNK_SIZE = 8000
+
+WORDS = (
+    "the model data we so this is really important because when you look at "
+    "results training system people actually going think right know about "
+    "performance network learning example problem question between different"
+).split()
+
+def make_transcript(seconds: int = Config.MAX_VIDEO_LENGTH, words_per_minute: int = 150) -> str:
+    """Synthetic spoken transcript: punctuated sentences with occasional paragraph breaks"""
+    rng = random.Random(42)
+    total_words = seconds // 60 * words_per_minute
+    sentences = []
+    written = 0
+
+    while written < total_words:
+        length = rng.randint(6, 24)
+        sentence = " ".join(rng.choice(WORDS) for _ in range(length))
+        sentences.append(sentence.capitalize() + rng.choice([".", ".", ".", "?", "!"]))
+        written += length
+        if rng.random() < 0.05:
+            sentences.append("\n\n")
+
+    return " ".join(sentences)
+
+def legacy_chunk_text(processor: TextProcessor, text: str) -> list:
+    """Previous chunker: re-encodes the full text, every section, every sentence and overlaps"""
+    text = processor.clean_text(text)
+
+    token_count = processor.count_tokens(text)
+    if token_count <= processor.max_chunk_size:
+        return [{'text': text, 'chunk_id': 0, 'total_chunks': 1, 'token_count': token_count}]
+
+    def get_overlap(chunk: str) -> str:
+        tokens = processor.encoding.encode(chunk)
+        overlap_tokens = tokens[-processor.overlap:] if len(tokens) > processor.overlap else tokens
+        return processor.encoding.decode(overlap_tokens)
+
+    sections = processor.split_by_sections(text)
+    chunks = []
+    current_chunk = ""
+    current_tokens = 0
+    chunk_id = 0
+
+    for section in sections:
+        section_tokens = processor.count_tokens(section)
+
+        if section_tokens > processor.max_chunk_size:
+            for sentence in re.split(r'(?<=[.!?])\s+', section):
+                sentence_tokens = processor.count_tokens(sentence)
+                if current_tokens + sentence_tokens > processor.max_chunk_size:
+                    if current_chunk:
+                        chunks.append({'text': current_chunk.strip(), 'chunk_id': chunk_id,
+                                       'token_count': current_tokens})
+                        chunk_id += 1
+                        current_chunk = get_overlap(current_chunk) + " " + sentence
+                        current_tokens = processor.count_tokens(current_chunk)
+                    else:
+                        current_chunk = sentence
+                        current_tokens = sentence_tokens
+                else:
+                    current_chunk += " " + sentence
+                    current_tokens += sentence_tokens
+        elif current_tokens + section_tokens <= processor.max_chunk_size:
+            current_chunk += "\n\n" + section
+            current_tokens += section_tokens
+        else:
+            if current_chunk:
+                chunks.append({'text': current_chunk.strip(), 'chunk_id': chunk_id,
+                               'token_count': current_tokens})
+                chunk_id += 1
+            current_chunk = section
+            current_tokens = section_tokens
+
+    if current_chunk:
+        chunks.append({'text': current_chunk.strip(), 'chunk_id': chunk_id, 'token_count': current_tokens})
+
+    for chunk in chunks:
+        chunk['total_chunks'] = len(chunks)
+
+    return chunks
+
+def best_time(func, runs: int) -> float:
+    """Best wall-clock time of `runs` calls, each with a cold token memo"""
+    best = float("inf")
+    for _ in range(runs):
+        TextProcessor.clear_token_memo()
+        start = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--runs", type=int, default=5)
+    args = parser.parse_args()
+
+    processor = TextProcessor(max_chunk_size=CHUNK_SIZE, overlap=Config.CHUNK_OVERLAP, packing="greedy")
+    text = make_transcript()
+
+    print(f"Transcript: {len(text):,} chars, {processor.count_tokens(text):,} tokens")
+
+    legacy_chunks = legacy_chunk_text(processor, text)
+    chunks = processor.chunk_text(text)
+    print(f"Chunks: legacy={len(legacy_chunks)}  single-pass={len(chunks)}")
+
+    legacy = best_time(lambda: legacy_chunk_text(processor, text), args.runs)
+    single = best_time(lambda: processor.chunk_text(text), args.runs)
+
+    print(f"Legacy chunker:      {legacy * 1000:8.1f} ms")
+    print(f"Single-pass chunker: {single * 1000:8.1f} ms")
+    print(f"Speedup:             {legacy / single:8.1f}x")
+    
+    # Chunk count and fill (each chunk is one map call) per packing mode
+    for packing in ("greedy", "optimal"):
+        packer = TextProcessor(max_chunk_size=CHUNK_SIZE, overlap=Config.CHUNK_OVERLAP, packing=packing)
+        stats = packer.get_packing_stats(packer.chunk_text(text))
+        print(f"Packing {packing:8s} {stats['chunks']:4d} chunks  "
+              f"mean fill {stats['mean_fill']:.1%}  min fill {stats['min_fill']:.1%}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,124 @@
+#!/usr/bin/env python3
+"""
+Website extraction benchmark
+Compares the single-pass lxml cleaner against the previous BeautifulSoup
+implementation (one find_all per removed tag, a class regex scan, then up to
+ten container searches) on the saved pages in benchmarks/pages/, reporting
+parse-and-clean time and how much text each keeps
+
+Usage: python benchmarks/bench_extraction.py [--runs N]
+"""
+
+import argparse
+import re
+import sys
+import time
+from pathlib import Path
+
+from bs4 import BeautifulSoup
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from src.extractors.website_extractor import WebsiteExtractor
+
+PAGES_DIR = Path(__file__).resolve().parent / "pages"
+
+# Lists used by the BeautifulSoup implementation
+LEGACY_REMOVE_TAGS = [
+    'script', 'style', 'nav', 'header', 'footer',
+    'aside', 'iframe', 'noscript', 'svg'
+]
+LEGACY_REMOVE_CLASSES = [
+    'ad', 'advertisement', 'promo', 'sidebar', 'related',
+    'popup', 'modal', 'newsletter', 'subscribe', 'social'
+]
+
+def legacy_parse_html(html: bytes) -> dict:
+    """Previous extractor: BeautifulSoup with a separate tree walk per cleanup step"""
+    soup = BeautifulSoup(html, 'lxml')
+
+    title = None
+    if soup.title:
+        title = soup.title.string.strip()
+    elif soup.find('h1'):
+        title = soup.find('h1').get_text().strip()
+
+    for tag in LEGACY_REMOVE_TAGS:
+        for element in soup.find_all(tag):
+            element.decompose()
+
+    for element in soup.find_all(class_=re.compile('|'.join(LEGACY_REMOVE_CLASSES), re.I)):
+        element.decompose()
+
+    main_content = soup.find('article')
+
+    if not main_content:
+        for tag in ['main', 'div']:
+            for class_name in ['content', 'main-content', 'article', 'post', 'entry']:
+                element = soup.find(tag, class_=re.compile(class_name, re.I))
+                if element:
+                    main_content = element
+                    break
+            if main_content:
+                break
+
+    if not main_content:
+        main_content = soup.find('body')
+
+    if not main_content:
+        return {'success': False, 'content': None, 'title': None}
+
+    text = main_content.get_text(separator='\n', strip=True)
+    lines = [line.strip() for line in text.split('\n') if line.strip()]
+    text = re.sub(r'\n{3,}', '\n\n', '\n'.join(lines))
+
+    if len(text) < 100:
+        return {'success': False, 'content': None, 'title': title}
+
+    return {'success': True, 'content': text, 'title': title}
+
+def best_time(func, html: bytes, runs: int) -> float:
+    """Best wall-clock time of `runs` calls"""
+    best = float("inf")
+    for _ in range(runs):
+        start = time.perf_counter()
+        func(html)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--runs", type=int, default=5)
+    args = parser.parse_args()
+
+    pages = sorted(PAGES_DIR.glob("*.html"))
+    if not pages:
+        print(f"No pages found in {PAGES_DIR}")
+        return
+
+    print(f"{'Page':22s} {'Size':>7s} {'BeautifulSoup':>14s} {'Single-pass':>12s} {'Speedup':>8s} "
+          f"{'Chars (old / new)':>18s}")
+
+    legacy_total = 0.0
+    single_total = 0.0
+    for page in pages:
+        html = page.read_bytes()
+
+        legacy_result = legacy_parse_html(html)
+        result = WebsiteExtractor.parse_html(html)
+
+        legacy = best_time(legacy_parse_html, html, args.runs)
+        single = best_time(WebsiteExtractor.parse_html, html, args.runs)
+        legacy_total += legacy
+        single_total += single
+
+        legacy_chars = len(legacy_result['content'] or '')
+        chars = len(result['content'] or '')
+        print(f"{page.name:22s} {len(html) // 1024:5d} KB {legacy * 1000:11.1f} ms {single * 1000:9.1f} ms "
+              f"{legacy / single:7.1f}x {legacy_chars:8,d} / {chars:,d}")
+
+    print(f"{'Total':30s} {legacy_total * 1000:11.1f} ms {single_total * 1000:9.1f} ms "
+          f"{legacy_total / single_total:7.1f}x")
+
+if __name__ == "__main__":
+    main()
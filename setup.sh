@@ -35,6 +35,15 @@ else
     pip3 install -r requirements.txt
 fi
 
+# Pre-fetch tokenizer so the app starts without network access to tiktoken
+echo ""
+echo "🔤 Caching tokenizer..."
+if python3 -c "from src.processors.tokenizer import get_encoding; get_encoding()" > /dev/null 2>&1; then
+    echo -e "${GREEN}✅ Tokenizer cached${NC}"
+else
+    echo -e "${YELLOW}⚠️  Could not fetch tokenizer (place cl100k_base.tiktoken in assets/tiktoken/ for offline use)${NC}"
+fi
+
 # Setup .env
 echo ""
 echo "🔑 Setting up environment..."
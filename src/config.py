@@ -31,14 +31,98 @@ class Config:
         "accurate": "gemini-1.5-pro"
     }
     
+    # Model capabilities: context window and output limit (tokens), and the
+    # output speed (tokens/s) assumed until latency has been measured
+    MODEL_CAPABILITIES = {
+        "llama-3.1-8b-instant": {"context_window": 131072, "max_output_tokens": 8192, "tokens_per_second": 750},
+        "llama-3.1-70b-versatile": {"context_window": 131072, "max_output_tokens": 8192, "tokens_per_second": 250},
+        "gemini-1.5-flash": {"context_window": 1048576, "max_output_tokens": 8192, "tokens_per_second": 200},
+        "gemini-1.5-pro": {"context_window": 2097152, "max_output_tokens": 8192, "tokens_per_second": 80}
+    }
+    
+    # Assumed for models missing from MODEL_CAPABILITIES
+    DEFAULT_MODEL_CAPABILITIES = {"context_window": 8192, "max_output_tokens": 4000, "tokens_per_second": 200}
+    
+    # Output token limits per call: summaries by depth, other tasks, and map/collapse calls
+    DEPTH_OUTPUT_TOKENS = {
+        "TL;DR (1-2 lines)": 200,
+        "Bullet Points": 700,
+        "Executive Summary": 1000,
+        "Detailed Summary": 3000,
+        "Structured Outline": 2000
+    }
+    TASK_OUTPUT_TOKENS = {"insights": 1000, "questions": 1000, "transform": 2000}
+    DEFAULT_OUTPUT_TOKENS = 4000  # Calls without a specific limit (e.g. source comparisons)
+    MAP_OUTPUT_TOKENS = 1024
+    
     # Processing Configuration
-    MAX_CHUNK_SIZE = 8000
+    MAX_CHUNK_SIZE = 32000  # Upper bound; each model's chunk size is derived from MODEL_CAPABILITIES
     CHUNK_OVERLAP = 500
+    CHUNK_PACKING = os.getenv("CHUNK_PACKING", "optimal")  # "optimal" (fewest, evenly filled chunks) or "greedy"
     MAX_VIDEO_LENGTH = 10800  # 3 hours in seconds
+    TOKEN_MEMO_MAX_TOKENS = 2_000_000  # Memoized encodings (~4 bytes per token)
+    TOKEN_MEMO_MAX_COUNTS = 10000  # Memoized token counts
+    CHUNK_MEMO_MAX_ENTRIES = 16  # Texts whose chunks are memoized (planning and digests re-chunk on every run)
+    MAP_CONCURRENCY = int(os.getenv("MAP_CONCURRENCY", "4"))  # Parallel chunk summaries
+    REDUCE_TOKEN_BUDGET = 12000  # Max combined summary tokens per reduce call (also bounded by the per-call limit)
+    PLANNER_MAX_CALLS = 60  # Strategies needing more LLM calls are not considered
+    PLANNER_REUSE_MARGIN = 0.25  # Map-reduce is preferred over refine when at most this much slower (its chunk summaries are reused)
+    DEDUP_THRESHOLD = 0.85  # Estimated Jaccard similarity above which chunks count as near-duplicates
+    BUDGETED_MAX_CALLS = 12  # Hard cap on calls for the budgeted strategy (representatives + reduce)
+    ASYNC_CONCURRENCY = int(os.getenv("ASYNC_CONCURRENCY", "8"))  # In-flight async LLM calls per event loop
+    COMPRESSION_RATIOS = {"fast": 0.35, "balanced": 0.6, "accurate": 1.0}  # Min share of tokens kept by extractive pre-compression
+    BUNDLE_MODE = os.getenv("BUNDLE_MODE", "false").lower() == "true"  # Summary, insights and questions in one call
+    SECTION_MODE = os.getenv("SECTION_MODE", "false").lower() == "true"  # Summarize YouTube videos section by section (one call per section)
     
     # Rate Limiting
     MAX_URLS_PER_SESSION = 10
     MAX_COMPARISON_URLS = 5
+    COMPARISON_FETCH_DEADLINE = float(os.getenv("COMPARISON_FETCH_DEADLINE", "45"))  # Seconds to extract all compared sources
+    
+    # Provider rate limits (free tier), shared by all LLMProvider instances
+    RATE_LIMITS = {
+        "groq": {"requests_per_minute": 30, "tokens_per_minute": 20000},
+        "gemini": {"requests_per_minute": 60, "tokens_per_minute": 1000000}
+    }
+    
+    # Per-model overrides of RATE_LIMITS
+    MODEL_RATE_LIMITS = {
+        "llama-3.1-70b-versatile": {"tokens_per_minute": 6000},
+        "gemini-1.5-pro": {"requests_per_minute": 2, "tokens_per_minute": 32000}
+    }
+    
+    # Set to a directory to coordinate rate limits across processes
+    RATE_LIMIT_LOCK_DIR = os.getenv("RATE_LIMIT_LOCK_DIR", "")
+    
+    # Caching
+    CACHE_DIR = Path(os.getenv("CACHE_DIR", ".cache"))
+    LLM_CACHE_ENABLED = os.getenv("LLM_CACHE_ENABLED", "true").lower() == "true"
+    LLM_CACHE_PATH = CACHE_DIR / "llm_responses.sqlite3"
+    LLM_CACHE_TTL = 7 * 24 * 3600  # 1 week in seconds
+    LLM_CACHE_MAX_ENTRIES = 5000
+    
+    PAGE_CACHE_ENABLED = os.getenv("PAGE_CACHE_ENABLED", "true").lower() == "true"
+    PAGE_CACHE_PATH = CACHE_DIR / "pages.sqlite3"
+    PAGE_CACHE_MAX_BYTES = 100 * 1024 * 1024  # Compressed bodies plus extracted text
+    
+    EXTRACTION_CACHE_TTL = 3600  # Seconds to reuse fetched content per URL
+    EXTRACTION_CACHE_MAX_ENTRIES = 50
+    
+    # HTTP fetching: pooled keep-alive connections and timeouts (seconds)
+    HTTP_CONNECT_TIMEOUT = float(os.getenv("HTTP_CONNECT_TIMEOUT", "5"))
+    HTTP_READ_TIMEOUT = float(os.getenv("HTTP_READ_TIMEOUT", "15"))
+    HTTP_POOL_HOSTS = 20  # Hosts with a kept connection pool
+    HTTP_POOL_PER_HOST = 4  # Keep-alive connections per host
+    HTTP_USER_AGENT = "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36"
+    
+    # Website downloads are streamed and aborted past this many (decompressed) bytes
+    WEBSITE_MAX_BYTES = int(os.getenv("WEBSITE_MAX_BYTES", str(10 * 1024 * 1024)))
+    WEBSITE_READ_CHUNK_BYTES = 64 * 1024
+    
+    # Tokenizer files: tiktoken's download cache, and an optional directory
+    # holding <encoding>.tiktoken BPE files for offline first use
+    TIKTOKEN_CACHE_DIR = Path(os.getenv("TIKTOKEN_CACHE_DIR", str(CACHE_DIR / "tiktoken")))
+    TIKTOKEN_BPE_DIR = Path(os.getenv("TIKTOKEN_BPE_DIR", "assets/tiktoken"))
     
     # Export Configuration
     EXPORT_FORMATS = ["PDF", "Markdown", "Plain Text"]
@@ -64,6 +148,11 @@ class Config:
     
     PROCESSING_MODES = ["Fast", "Balanced", "Accurate"]
     
+    @classmethod
+    def get_model_capabilities(cls, model: str) -> dict:
+        """Capabilities of a model, falling back to DEFAULT_MODEL_CAPABILITIES"""
+        return cls.MODEL_CAPABILITIES.get(model, cls.DEFAULT_MODEL_CAPABILITIES)
+    
     @classmethod
     def is_configured(cls):
         """Check if API keys are configured"""
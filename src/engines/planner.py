@@ -0,0 +1,258 @@
+"""
+Cost/latency-aware summarization strategy planner
+"""
+
+import math
+from typing import List, Dict
+from src.config import Config
+from src.llm.provider import LLMProvider
+
+class StrategyPlanner:
+    """Estimate calls, tokens and wall time per strategy and pick the fastest that fits"""
+
+    # Expected output sizes used for estimates
+    SUMMARY_OUTPUT_TOKENS = 600
+    MAP_OUTPUT_TOKENS = 400
+
+    # Instruction and formatting tokens added to every call
+    PROMPT_OVERHEAD_TOKENS = 150
+
+    def __init__(self, llm_provider: LLMProvider):
+        self.llm = llm_provider
+
+    def plan(self,
+             token_count: int,
+             chunks: List[Dict],
+             concurrency: int,
+             chunk_summaries_cached: bool = False,
+             summary_output_tokens: int = SUMMARY_OUTPUT_TOKENS,
+             representatives_cached: bool = False) -> Dict:
+        """
+        Estimate every strategy without calling the LLM
+
+        Args:
+            token_count: Tokens in the full content
+            chunks: Chunks from TextProcessor.chunk_text
+            concurrency: Parallel calls available to the map phase
+            chunk_summaries_cached: Map-phase output is already cached
+            summary_output_tokens: Expected length of the final summary
+            representatives_cached: Budgeted representative summaries are already cached
+
+        Returns: {
+            'strategy': str,
+            'model': str,
+            'context_window': int,
+            'concurrency': int,
+            'estimates': {strategy: {'calls', 'input_tokens', 'output_tokens',
+                                     'wall_time', 'fits'}}
+        }
+        """
+        estimates = {
+            'stuff': self._estimate_stuff(token_count, summary_output_tokens),
+            'refine': self._estimate_refine(token_count, chunks, summary_output_tokens),
+            'map_reduce': self._estimate_map_reduce(
+                token_count, chunks, concurrency, chunk_summaries_cached, summary_output_tokens
+            ),
+            'budgeted': self._estimate_budgeted(
+                chunks, concurrency, representatives_cached, summary_output_tokens
+            )
+        }
+
+        # Budgeted skips content, so it is only used when no full-coverage strategy fits
+        fitting = [
+            name for name, estimate in estimates.items()
+            if estimate['fits'] and name != 'budgeted'
+        ]
+        if fitting:
+            strategy = min(
+                fitting,
+                key=lambda name: (estimates[name]['wall_time'], estimates[name]['input_tokens'])
+            )
+            # Map-reduce caches its chunk summaries, so later regenerations are one
+            # call; refine caches nothing. Near-ties (e.g. both bound by the rate
+            # limit) go to map-reduce.
+            if strategy == 'refine' and 'map_reduce' in fitting and (
+                    estimates['map_reduce']['wall_time'] <=
+                    estimates['refine']['wall_time'] * (1 + Config.PLANNER_REUSE_MARGIN)):
+                strategy = 'map_reduce'
+        elif estimates['budgeted']['fits']:
+            strategy = 'budgeted'
+        else:
+            # Tree reduce keeps every call within the window, whatever the length
+            strategy = 'map_reduce'
+
+        return {
+            'strategy': strategy,
+            'model': self.llm.get_model_name(),
+            'context_window': self._get_context_window(),
+            'concurrency': concurrency,
+            'estimates': estimates
+        }
+
+    def get_stuff_budget(self, summary_output_tokens: int = SUMMARY_OUTPUT_TOKENS) -> int:
+        """Largest content, in tokens, that a single stuff call can take"""
+        return self.get_max_call_tokens() - self.PROMPT_OVERHEAD_TOKENS - summary_output_tokens
+
+    def get_reduce_budget(self, output_tokens: int) -> int:
+        """
+        Summary tokens one reduce or collapse call can take
+
+        The per-call ceiling less prompt overhead and the call's output
+        limit, capped by Config.REDUCE_TOKEN_BUDGET.
+        """
+        return max(1, min(Config.REDUCE_TOKEN_BUDGET, self.get_stuff_budget(output_tokens)))
+    
+    def _estimate_stuff(self, token_count: int, output_tokens: int) -> Dict:
+        input_tokens = token_count + self.PROMPT_OVERHEAD_TOKENS
+
+        return self._build_estimate(
+            calls=1,
+            input_tokens=input_tokens,
+            output_tokens=output_tokens,
+            wall_time=self._call_time(output_tokens),
+            largest_call=input_tokens + output_tokens
+        )
+
+    def _estimate_refine(self, token_count: int, chunks: List[Dict], output_tokens: int) -> Dict:
+        calls = len(chunks)
+        largest_chunk = max(chunk['token_count'] for chunk in chunks)
+        per_call_overhead = self.PROMPT_OVERHEAD_TOKENS + output_tokens
+
+        # Every pass after the first re-sends the running summary; passes are serial
+        return self._build_estimate(
+            calls=calls,
+            input_tokens=token_count + calls * self.PROMPT_OVERHEAD_TOKENS + (calls - 1) * output_tokens,
+            output_tokens=calls * output_tokens,
+            wall_time=calls * self._call_time(output_tokens),
+            largest_call=largest_chunk + per_call_overhead + output_tokens
+        )
+
+    def _estimate_map_reduce(self,
+                             token_count: int,
+                             chunks: List[Dict],
+                             concurrency: int,
+                             cached: bool,
+                             output_tokens: int) -> Dict:
+        map_output = self.MAP_OUTPUT_TOKENS
+        map_time = self._call_time(map_output)
+        largest_chunk = max(chunk['token_count'] for chunk in chunks)
+
+        calls = 0 if cached else len(chunks)
+        input_tokens = 0 if cached else token_count + calls * self.PROMPT_OVERHEAD_TOKENS
+        generated = calls * map_output
+        wall_time = math.ceil(calls / concurrency) * map_time
+
+        # Tree reduce levels until the summaries fit the final call
+        final_budget = self.get_reduce_budget(output_tokens)
+        collapse_budget = self.get_reduce_budget(Config.MAP_OUTPUT_TOKENS)
+        summary_tokens = len(chunks) * map_output
+        largest_call = largest_chunk + self.PROMPT_OVERHEAD_TOKENS + map_output
+        while summary_tokens > final_budget:
+            batches = math.ceil(summary_tokens / collapse_budget)
+            if batches * map_output >= summary_tokens:
+                break
+            largest_call = max(
+                largest_call,
+                min(summary_tokens, collapse_budget) + self.PROMPT_OVERHEAD_TOKENS + Config.MAP_OUTPUT_TOKENS
+            )
+            calls += batches
+            input_tokens += summary_tokens + batches * self.PROMPT_OVERHEAD_TOKENS
+            generated += batches * map_output
+            wall_time += math.ceil(batches / concurrency) * map_time
+            summary_tokens = batches * map_output
+
+        # Final reduce
+        calls += 1
+        input_tokens += summary_tokens + self.PROMPT_OVERHEAD_TOKENS
+        generated += output_tokens
+        wall_time += self._call_time(output_tokens)
+
+        return self._build_estimate(
+            calls=calls,
+            input_tokens=input_tokens,
+            output_tokens=generated,
+            wall_time=wall_time,
+            largest_call=max(largest_call, summary_tokens + self.PROMPT_OVERHEAD_TOKENS + output_tokens)
+        )
+
+    def _estimate_budgeted(self,
+                           chunks: List[Dict],
+                           concurrency: int,
+                           cached: bool,
+                           output_tokens: int) -> Dict:
+        map_output = self.MAP_OUTPUT_TOKENS
+        representatives = self.get_budgeted_clusters(len(chunks))
+        largest_chunk = max(chunk['token_count'] for chunk in chunks)
+        average_chunk = sum(chunk['token_count'] for chunk in chunks) / len(chunks)
+        reduce_input = representatives * map_output + self.PROMPT_OVERHEAD_TOKENS
+        map_calls = 0 if cached else representatives
+
+        # One map call per representative chunk, then a single reduce
+        return self._build_estimate(
+            calls=map_calls + 1,
+            input_tokens=int(map_calls * (average_chunk + self.PROMPT_OVERHEAD_TOKENS) + reduce_input),
+            output_tokens=map_calls * map_output + output_tokens,
+            wall_time=(math.ceil(map_calls / concurrency) * self._call_time(map_output) +
+                       self._call_time(output_tokens)),
+            largest_call=max(largest_chunk + self.PROMPT_OVERHEAD_TOKENS + map_output,
+                             reduce_input + output_tokens)
+        )
+
+    def get_budgeted_clusters(self, num_chunks: int) -> int:
+        """
+        Representative chunks for the budgeted strategy: within the call cap and a single reduce
+
+        Sized for the longest summary depth, so every depth picks the same
+        representatives and reuses their cached summaries.
+        """
+        longest_output = max(Config.DEPTH_OUTPUT_TOKENS.values())
+        return max(1, min(
+            num_chunks,
+            Config.BUDGETED_MAX_CALLS - 1,
+            self.get_reduce_budget(longest_output) // self.MAP_OUTPUT_TOKENS
+        ))
+
+    def _build_estimate(self,
+                        calls: int,
+                        input_tokens: int,
+                        output_tokens: int,
+                        wall_time: float,
+                        largest_call: int) -> Dict:
+        """
+        Add rate-limit wait and the budget check to a raw estimate
+
+        largest_call is the biggest single request (input plus output tokens).
+        """
+        wall_time = max(wall_time, self._rate_limit_time(calls, input_tokens + output_tokens))
+
+        fits = (
+            largest_call <= self.get_max_call_tokens() and
+            calls <= Config.PLANNER_MAX_CALLS
+        )
+
+        return {
+            'calls': calls,
+            'input_tokens': input_tokens,
+            'output_tokens': output_tokens,
+            'wall_time': round(wall_time, 2),
+            'fits': fits
+        }
+
+    def _call_time(self, output_tokens: int) -> float:
+        """Estimated seconds for one call, from measured latency when available"""
+        default_speed = Config.get_model_capabilities(self.llm.get_model_name())["tokens_per_second"]
+        return self.llm.latency.estimate(output_tokens, default_speed)
+
+    def _rate_limit_time(self, calls: int, tokens: int) -> float:
+        """Minimum seconds the provider's rate limits allow for this much work"""
+        limiter = self.llm.rate_limiter
+        request_time = max(0.0, calls - limiter.requests.capacity) / limiter.requests.refill_per_second
+        token_time = max(0.0, tokens - limiter.tokens.capacity) / limiter.tokens.refill_per_second
+        return max(request_time, token_time)
+
+    def _get_context_window(self) -> int:
+        return Config.get_model_capabilities(self.llm.get_model_name())["context_window"]
+
+    def get_max_call_tokens(self) -> int:
+        """Largest single request: the context window, or the per-minute token budget if smaller"""
+        return min(self._get_context_window(), int(self.llm.rate_limiter.tokens.capacity))
@@ -2,22 +2,85 @@
 Summarization engine with multiple strategies
 """
 
-from typing import List, Dict, Optional
+import asyncio
+import hashlib
+import json
+import re
+import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import List, Dict, Optional, Iterator, Tuple, Union
+from src.config import Config
+from src.engines.planner import StrategyPlanner
+from src.extractors.youtube_extractor import YouTubeExtractor
+from src.llm.cache import ResponseCache
 from src.llm.provider import LLMProvider
+from src.processors.clustering import select_representatives
+from src.processors.compressor import ExtractiveCompressor
+from src.processors.dedup import find_near_duplicates
 from src.processors.text_processor import TextProcessor
 
+# Prefix of the stand-in text used when a chunk summary could not be generated
+FAILED_CHUNK_MARKER = "[Excerpt - summary unavailable]"
+
+# Characters of raw text kept in place of one failed map or collapse call
+FAILED_EXCERPT_CHARS = 2000
+
+# Stand-in for a chunk that nearly duplicates an earlier one (1-based part number)
+DUPLICATE_CHUNK_MARKER = "[Repeats part {}]"
+DUPLICATE_CHUNK_PATTERN = re.compile(re.escape(DUPLICATE_CHUNK_MARKER).replace(r'\{\}', r'\d+'))
+
+INSIGHTS_INSTRUCTION = """Analyze this content and extract:
+
+1. Key Ideas: Main concepts and themes
+2. Arguments: Primary arguments made
+3. Evidence: Supporting evidence provided
+4. Implications: What this means or suggests
+5. Limitations: Any gaps or limitations noted
+
+Be specific and cite relevant points."""
+
+QUESTION_INSTRUCTIONS = {
+    "study": "Generate 10 study questions that test understanding of this content.",
+    "discussion": "Generate 5 thought-provoking discussion questions.",
+    "interview": "Generate potential interview questions based on this content.",
+    "mcq": "Generate 5 multiple-choice questions with 4 options each (mark correct answer)."
+}
+
+TRANSFORM_INSTRUCTIONS = {
+    "blog": "Transform this into a well-structured blog post with introduction, body sections, and conclusion.",
+    "linkedin": "Create an engaging LinkedIn post (max 1300 characters) with relevant hashtags.",
+    "email": "Draft a professional email summarizing this content.",
+    "meeting_notes": "Format this as structured meeting notes with action items.",
+    "notion": "Create a Notion-style structured document with headers, sections, and bullet points."
+}
+
 class SummarizationEngine:
     """Multi-strategy summarization engine"""
     
     def __init__(self, llm_provider: LLMProvider):
         self.llm = llm_provider
-        self.processor = TextProcessor()
+        self.chunk_cache = ResponseCache.get_shared("chunk_summaries")
+        self.planner = StrategyPlanner(llm_provider)
+        
+        # Chunks sized to fill one map call for this model
+        self.processor = TextProcessor.for_model(
+            llm_provider.get_model_name(),
+            token_limit=int(llm_provider.rate_limiter.tokens.capacity),
+            reserved_tokens=StrategyPlanner.PROMPT_OVERHEAD_TOKENS + Config.MAP_OUTPUT_TOKENS
+        )
+        self.compressor = ExtractiveCompressor(self.processor)
+        
+        # Map-phase chunks seen and calls skipped as near-duplicates
+        self.dedup_stats = {'chunks': 0, 'calls_saved': 0}
+        self._stats_lock = threading.Lock()
     
     def summarize(self, 
                   content: str, 
                   depth: str = "Executive Summary",
                   style: str = "Executive Tone",
-                  source_type: str = "website") -> str:
+                  source_type: str = "website",
+                  token_count: Optional[int] = None,
+                  use_cache: bool = True) -> str:
         """
         Main summarization method
         
@@ -26,78 +89,618 @@ class SummarizationEngine:
             depth: Summary depth (TL;DR, Bullet Points, etc.)
             style: Writing style
             source_type: 'youtube' or 'website'
+            token_count: Token count from extraction metadata, if already known
+            use_cache: Set False to bypass the response cache for the final call
+                (chunk summaries are still reused), e.g. on Regenerate
+        """
+        final_call = self._prepare_summary(content, depth, style, token_count)
+        
+        if 'context' in final_call:
+            return self.llm.generate_with_context(**final_call, use_cache=use_cache)
+        return self.llm.generate(**final_call, use_cache=use_cache)
+    
+    def summarize_stream(self, 
+                         content: str, 
+                         depth: str = "Executive Summary",
+                         style: str = "Executive Tone",
+                         source_type: str = "website",
+                         token_count: Optional[int] = None,
+                         use_cache: bool = True) -> Iterator[str]:
+        """
+        Streaming variant of summarize()
+        
+        Intermediate calls (map phase, earlier refine passes) run first;
+        only the final call that produces the summary is streamed.
+        """
+        final_call = self._prepare_summary(content, depth, style, token_count)
+        
+        if 'context' in final_call:
+            yield from self.llm.stream_with_context(**final_call, use_cache=use_cache)
+        else:
+            yield from self.llm.stream(**final_call, use_cache=use_cache)
+    
+    def _prepare_summary(self, 
+                         content: str, 
+                         depth: str, 
+                         style: str,
+                         token_count: Optional[int] = None) -> Dict[str, str]:
+        """
+        Run every call except the last and return the final call's arguments
+        
+        Returns kwargs for generate_with_context() when they include 'context',
+        otherwise kwargs for generate().
         """
-        # Choose strategy based on content length
-        token_count = self.processor.count_tokens(content)
+        plan = self.plan(content, depth, style, token_count)
+        strategy = plan['strategy']
+        content = plan['content']
         
-        if token_count < 4000:
+        if strategy == 'stuff':
             # Single-pass summarization
-            return self._stuff_summarize(content, depth, style)
-        elif token_count < 15000:
-            # Refine strategy
-            return self._refine_summarize(content, depth, style)
+            return self._prepare_stuff(content, depth, style)
+        
+        chunks = plan['chunks']
+        
+        # Chunk summaries from an earlier run only need the reduce call
+        chunk_summaries = self._load_chunk_summaries(content, chunks)
+        if chunk_summaries:
+            return self._get_reduce_call(chunk_summaries, depth, style)
+        
+        if strategy == 'refine':
+            # Sequential refinement
+            return self._prepare_refine(chunks, depth, style)
+        elif strategy == 'budgeted':
+            # Representative chunks only, bounded number of calls
+            return self._prepare_budgeted(content, chunks, depth, style)
         else:
-            # Map-reduce for very long content
-            return self._map_reduce_summarize(content, depth, style)
+            # Parallel map, tree reduce
+            return self._prepare_map_reduce(content, chunks, depth, style)
     
-    def _stuff_summarize(self, content: str, depth: str, style: str) -> str:
+    def plan(self, 
+             content: str, 
+             depth: str = "Executive Summary",
+             style: str = "Executive Tone",
+             token_count: Optional[int] = None) -> Dict:
+        """
+        Dry run: choose a strategy and estimate its cost without calling the LLM
+        
+        Content is first compressed as far as the processing mode allows.
+        Returns the planner's estimates plus the (possibly compressed)
+        'content', its 'token_count', 'original_token_count', the 'chunks'
+        the chosen strategy would use and their 'packing' fill stats.
+        """
+        if token_count is None:
+            token_count = self.processor.count_tokens(content)
+        original_token_count = token_count
+        content, token_count = self._compress(content, token_count, self._get_output_tokens(depth))
+        
+        chunks = self.processor.chunk_text(content)
+        cached = self._load_chunk_summaries(content, chunks) is not None
+        
+        plan = self.planner.plan(
+            token_count=token_count,
+            chunks=chunks,
+            concurrency=self._get_map_concurrency(len(chunks)),
+            chunk_summaries_cached=cached,
+            summary_output_tokens=self._get_output_tokens(depth),
+            representatives_cached=self._load_representatives(content, chunks) is not None
+        )
+        plan['content'] = content
+        plan['token_count'] = token_count
+        plan['original_token_count'] = original_token_count
+        plan['chunks'] = chunks
+        plan['packing'] = self.processor.get_packing_stats(chunks)
+        
+        return plan
+    
+    def _compress(self, content: str, token_count: int, output_tokens: int) -> Tuple[str, int]:
+        """
+        Extractive pre-compression within the mode's Config.COMPRESSION_RATIOS
+        
+        Compresses to the single-call budget (for a call with output_tokens
+        of output) when the ratio allows it, so long content needs one stuff
+        call; otherwise to the ratio itself, which gives the same text, and
+        so the same cached chunk summaries, whatever the output limit.
+        """
+        ratio = Config.COMPRESSION_RATIOS.get(self.llm.mode, 1.0)
+        stuff_budget = self.planner.get_stuff_budget(output_tokens)
+        if ratio >= 1.0 or token_count <= stuff_budget:
+            return content, token_count
+        
+        target = max(int(token_count * ratio), stuff_budget)
+        compressed = self.compressor.compress(content, target)
+        
+        return compressed, self.processor.count_tokens(compressed)
+    
+    def _prepare_stuff(self, content: str, depth: str, style: str) -> Dict[str, str]:
         """Single-pass summarization for short content"""
         instruction = self._get_instruction(depth, style)
         
-        return self.llm.generate_with_context(
-            context=content,
-            instruction=instruction,
-            style=style
-        )
+        return {
+            'context': content,
+            'instruction': instruction,
+            'style': style,
+            'max_tokens': self._get_output_tokens(depth)
+        }
     
-    def _refine_summarize(self, content: str, depth: str, style: str) -> str:
+    def _prepare_refine(self, chunks: List[Dict], depth: str, style: str) -> Dict[str, str]:
         """Iterative refinement for medium content"""
-        chunks = self.processor.chunk_text(content)
+        instruction = self._get_instruction(depth, style)
+        max_tokens = self._get_output_tokens(depth)
+        
+        first_call = {
+            'context': chunks[0]['text'],
+            'instruction': instruction,
+            'style': style,
+            'max_tokens': max_tokens
+        }
+        if len(chunks) == 1:
+            return first_call
         
         # First pass: summarize first chunk
+        current_summary = self.llm.generate_with_context(**first_call)
+        
+        # Subsequent passes: refine with additional chunks, leaving the last one
+        for chunk in chunks[1:-1]:
+            refine_instruction = self._get_refine_instruction(instruction, current_summary, chunk['text'])
+            current_summary = self.llm.generate(refine_instruction, max_tokens=max_tokens)
+        
+        return {
+            'prompt': self._get_refine_instruction(instruction, current_summary, chunks[-1]['text']),
+            'max_tokens': max_tokens
+        }
+    
+    def _prepare_map_reduce(self, 
+                            content: str, 
+                            chunks: List[Dict], 
+                            depth: str, 
+                            style: str) -> Dict[str, str]:
+        """Map-reduce for very long content"""
+        # Map: Summarize chunks in parallel
+        chunk_summaries = self._map_chunks(chunks)
+        self._store_chunk_summaries(content, chunks, chunk_summaries)
+        
+        # Reduce: Combine summaries
+        return self._get_reduce_call(chunk_summaries, depth, style)
+    
+    def _prepare_budgeted(self, 
+                          content: str, 
+                          chunks: List[Dict], 
+                          depth: str, 
+                          style: str) -> Dict[str, str]:
+        """Summarize one representative chunk per cluster and reduce them weighted by cluster size"""
+        clusters, summaries = self._get_representatives(content, chunks)
+        
+        return self._get_budgeted_reduce_call(clusters, summaries, len(chunks), depth, style)
+    
+    def _get_representatives(self, content: str, chunks: List[Dict]) -> Tuple[List[Dict], List[str]]:
+        """Clusters and their representative summaries, from the cache or mapped and stored"""
+        cached = self._load_representatives(content, chunks)
+        if cached:
+            return cached
+        
+        clusters = self._select_clusters(chunks)
+        representatives = [chunks[cluster['index']] for cluster in clusters]
+        
+        results = self._generate_parallel(
+            [self._get_map_instruction(chunk['text']) for chunk in representatives]
+        )
+        summaries = self._merge_map_results(representatives, results)
+        self._store_representatives(content, chunks, clusters, summaries)
+        
+        return clusters, summaries
+    
+    def _select_clusters(self, chunks: List[Dict]) -> List[Dict]:
+        """Clusters of similar chunks for the budgeted strategy (see select_representatives)"""
+        return select_representatives(
+            [chunk['text'] for chunk in chunks],
+            self.planner.get_budgeted_clusters(len(chunks))
+        )
+    
+    def _get_budgeted_reduce_call(self, 
+                                  clusters: List[Dict], 
+                                  summaries: List[str], 
+                                  num_chunks: int,
+                                  depth: str, 
+                                  style: str) -> Dict[str, str]:
+        """Reduce call where each representative summary is labelled with the share it stands for"""
+        return {
+            'context': "\n\n".join(self._label_representatives(clusters, summaries, num_chunks)),
+            'instruction': (
+                f"{self._get_instruction(depth, style)} "
+                "Each summary stands for several similar parts of the content; "
+                "give each one weight in proportion to the share it represents."
+            ),
+            'style': style,
+            'max_tokens': self._get_output_tokens(depth)
+        }
+    
+    def _label_representatives(self, clusters: List[Dict], summaries: List[str], num_chunks: int) -> List[str]:
+        """Representative summaries prefixed with the share of the content each stands for"""
+        return [
+            f"[Represents {len(cluster['members'])} of {num_chunks} parts "
+            f"({len(cluster['members']) / num_chunks:.0%} of the content)]\n{summary}"
+            for cluster, summary in zip(clusters, summaries)
+        ]
+    
+    def _get_reduce_call(self, chunk_summaries: List[str], depth: str, style: str) -> Dict[str, str]:
+        """Final call combining chunk summaries at the requested depth and style"""
+        max_tokens = self._get_output_tokens(depth)
+        chunk_summaries = self._collapse_summaries(self._drop_duplicates(chunk_summaries), max_tokens)
+        
+        return {
+            'context': "\n\n".join(chunk_summaries),
+            'instruction': self._get_instruction(depth, style),
+            'style': style,
+            'max_tokens': max_tokens
+        }
+    
+    def _chunk_summary_key(self, content: str, chunks: List[Dict]) -> str:
+        """
+        Key for a document's map-phase output
+        
+        Depends on content, chunk boundaries, model and map prompt, but not on
+        depth or style, so regenerations with new settings reuse it.
+        """
+        payload = json.dumps([
+            hashlib.sha256(content.encode('utf-8')).hexdigest(),
+            [chunk['token_count'] for chunk in chunks],
+            self.processor.max_chunk_size,
+            self.processor.overlap,
+            self.llm.provider,
+            self.llm.get_model_name(),
+            self._get_map_instruction("")
+        ])
+        return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+    
+    def _load_chunk_summaries(self, content: str, chunks: List[Dict]) -> Optional[List[str]]:
+        """Cached chunk summaries for this document, if any"""
+        if not self.chunk_cache:
+            return None
+        
+        cached = self.chunk_cache.get(self._chunk_summary_key(content, chunks))
+        if cached is None:
+            return None
+        
+        summaries = json.loads(cached)
+        return summaries if len(summaries) == len(chunks) else None
+    
+    def _store_chunk_summaries(self, content: str, chunks: List[Dict], summaries: List[str]):
+        """Persist chunk summaries unless some chunks fell back to raw excerpts"""
+        if not self.chunk_cache:
+            return
+        if any(summary.startswith(FAILED_CHUNK_MARKER) for summary in summaries):
+            return
+        
+        self.chunk_cache.set(self._chunk_summary_key(content, chunks), json.dumps(summaries))
+    
+    def _representatives_key(self, content: str, chunks: List[Dict]) -> str:
+        """Key for the budgeted strategy's clusters and representative summaries"""
+        payload = json.dumps([
+            'representatives',
+            self._chunk_summary_key(content, chunks),
+            self.planner.get_budgeted_clusters(len(chunks))
+        ])
+        return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+    
+    def _load_representatives(self, 
+                              content: str, 
+                              chunks: List[Dict]) -> Optional[Tuple[List[Dict], List[str]]]:
+        """Cached (clusters, representative summaries) for this document, if any"""
+        if not self.chunk_cache:
+            return None
+        
+        cached = self.chunk_cache.get(self._representatives_key(content, chunks))
+        if cached is None:
+            return None
+        
+        data = json.loads(cached)
+        return data['clusters'], data['summaries']
+    
+    def _store_representatives(self, 
+                               content: str, 
+                               chunks: List[Dict], 
+                               clusters: List[Dict], 
+                               summaries: List[str]):
+        """Persist clusters and representative summaries unless some fell back to raw excerpts"""
+        if not self.chunk_cache:
+            return
+        if any(summary.startswith(FAILED_CHUNK_MARKER) for summary in summaries):
+            return
+        
+        self.chunk_cache.set(
+            self._representatives_key(content, chunks),
+            json.dumps({'clusters': clusters, 'summaries': summaries})
+        )
+    
+    def _map_chunks(self, chunks: List[Dict]) -> List[str]:
+        """
+        Summarize chunks with bounded concurrency
+        
+        Results keep chunk order. A chunk whose call fails twice is replaced
+        by a raw excerpt so the reduce step still covers it. Near-duplicate
+        chunks are summarized once and referenced by the others.
+        """
+        canonical = self._find_duplicates(chunks)
+        unique = [chunk for index, chunk in enumerate(chunks) if canonical[index] == index]
+        
+        results = self._generate_parallel(
+            [self._get_map_instruction(chunk['text']) for chunk in unique]
+        )
+        return self._expand_duplicates(canonical, self._merge_map_results(unique, results))
+    
+    def _find_duplicates(self, chunks: List[Dict]) -> List[int]:
+        """Near-duplicate mapping for the map phase (see find_near_duplicates), recorded in dedup_stats"""
+        canonical = find_near_duplicates(chunks)
+        saved = sum(1 for index, target in enumerate(canonical) if target != index)
+        
+        with self._stats_lock:
+            self.dedup_stats['chunks'] += len(chunks)
+            self.dedup_stats['calls_saved'] += saved
+        
+        return canonical
+    
+    def _expand_duplicates(self, canonical: List[int], unique_summaries: List[str]) -> List[str]:
+        """One summary per chunk: unique chunks get theirs, duplicates a reference to the original"""
+        summaries = iter(unique_summaries)
+        return [
+            next(summaries) if target == index else DUPLICATE_CHUNK_MARKER.format(target + 1)
+            for index, target in enumerate(canonical)
+        ]
+    
+    def _drop_duplicates(self, summaries: List[str]) -> List[str]:
+        """
+        Chunk summaries without near-duplicate stand-ins, for reduce and collapse
+        
+        Their part numbers cannot be resolved once summaries are batched and
+        merged, and the part they repeat is already among the summaries.
+        """
+        return [summary for summary in summaries if not DUPLICATE_CHUNK_PATTERN.fullmatch(summary)]
+    
+    def get_dedup_stats(self) -> Dict[str, float]:
+        """Chunks seen by the map phase and calls saved by near-duplicate detection"""
+        with self._stats_lock:
+            chunks = self.dedup_stats['chunks']
+            saved = self.dedup_stats['calls_saved']
+        
+        return {
+            'chunks': chunks,
+            'calls_saved': saved,
+            'saved_rate': saved / chunks if chunks else 0.0
+        }
+    
+    def _generate_parallel(self, instructions: List[str]) -> List[Optional[str]]:
+        """Run independent prompts on a thread pool; failed prompts (after a retry) yield None"""
+        def run(indexed: Tuple[int, str]) -> Optional[str]:
+            return self._generate_with_retry(*indexed)
+        
+        with ThreadPoolExecutor(max_workers=self._get_map_concurrency(len(instructions))) as executor:
+            return list(executor.map(run, enumerate(instructions)))
+    
+    def _generate_with_retry(self, index: int, instruction: str) -> Optional[str]:
+        """One parallel call with a single retry; None if both attempts fail"""
+        for attempt in range(2):
+            try:
+                return self.llm.generate(instruction, max_tokens=Config.MAP_OUTPUT_TOKENS)
+            except Exception as e:
+                error = e
+        print(f"Parallel call {index} failed: {error}")
+        return None
+    
+    def _collapse_summaries(self, summaries: List[str], output_tokens: int) -> List[str]:
+        """
+        Tree reduce: merge summaries in token-budgeted batches until they fit one call
+        
+        Each level reduces its batches in parallel, so calls and latency grow
+        with the log of the number of chunks. output_tokens is the output
+        limit of the final call the summaries must fit.
+        """
+        batches = self._batch_summaries(summaries, output_tokens)
+        
+        while batches:
+            results = self._generate_parallel(
+                [self._get_collapse_instruction(batch) for batch in batches]
+            )
+            summaries = self._merge_collapse_results(batches, results)
+            batches = self._batch_summaries(summaries, output_tokens)
+        
+        return summaries
+    
+    def _batch_summaries(self, summaries: List[str], output_tokens: int) -> Optional[List[List[str]]]:
+        """
+        Group consecutive summaries into batches that each fit one collapse call
+        
+        Returns None when everything already fits the final call, whose
+        output limit is output_tokens.
+        """
+        budget = self.planner.get_reduce_budget(Config.MAP_OUTPUT_TOKENS)
+        counts = [self.processor.count_tokens(summary) for summary in summaries]
+        
+        if len(summaries) < 2 or sum(counts) <= self.planner.get_reduce_budget(output_tokens):
+            return None
+        
+        batches = []
+        current, current_tokens = [], 0
+        for summary, count in zip(summaries, counts):
+            if current and current_tokens + count > budget:
+                batches.append(current)
+                current, current_tokens = [], 0
+            current.append(summary)
+            current_tokens += count
+        batches.append(current)
+        
+        # Every summary is too large to share a batch: merge pairwise to guarantee progress
+        if len(batches) == len(summaries):
+            batches = [summaries[i:i + 2] for i in range(0, len(summaries), 2)]
+        
+        return batches
+    
+    def _merge_collapse_results(self, batches: List[List[str]], results: List[Optional[str]]) -> List[str]:
+        """
+        Replace failed collapse calls with excerpts of every member of the batch
+        
+        The excerpts share the size of one failed map excerpt, so each level
+        still shrinks and no part of the document drops out.
+        """
+        if all(result is None for result in results):
+            raise Exception("Summarization failed while combining partial summaries")
+        
+        merged = []
+        for batch, result in zip(batches, results):
+            if result is None:
+                share = FAILED_EXCERPT_CHARS // len(batch)
+                result = "\n\n".join(f"{FAILED_CHUNK_MARKER}\n{summary[:share]}" for summary in batch)
+            merged.append(result)
+        
+        return merged
+    
+    def _merge_map_results(self, chunks: List[Dict], results: List[Optional[str]]) -> List[str]:
+        """Replace failed chunk summaries with raw excerpts, keeping chunk order"""
+        if all(result is None for result in results):
+            raise Exception("Summarization failed for every chunk")
+        
+        return [
+            result if result is not None
+            else f"{FAILED_CHUNK_MARKER}\n{chunk['text'][:FAILED_EXCERPT_CHARS]}"
+            for chunk, result in zip(chunks, results)
+        ]
+    
+    def _get_map_concurrency(self, num_chunks: int) -> int:
+        """Concurrency for the map phase, capped by config and provider rate limit"""
+        requests_per_minute = int(self.llm.rate_limiter.requests.capacity)
+        return max(1, min(Config.MAP_CONCURRENCY, num_chunks, requests_per_minute))
+    
+    async def asummarize(self, 
+                         content: str, 
+                         depth: str = "Executive Summary",
+                         style: str = "Executive Tone",
+                         source_type: str = "website",
+                         token_count: Optional[int] = None) -> str:
+        """Async counterpart of summarize(); map calls are awaited concurrently"""
+        plan = self.plan(content, depth, style, token_count)
         instruction = self._get_instruction(depth, style)
-        current_summary = self.llm.generate_with_context(
-            context=chunks[0]['text'],
+        max_tokens = self._get_output_tokens(depth)
+        content = plan['content']
+        
+        if plan['strategy'] == 'stuff':
+            return await self.llm.agenerate_with_context(
+                context=content,
+                instruction=instruction,
+                style=style,
+                max_tokens=max_tokens
+            )
+        
+        chunks = plan['chunks']
+        chunk_summaries = self._load_chunk_summaries(content, chunks)
+        
+        if not chunk_summaries and plan['strategy'] == 'budgeted':
+            cached = self._load_representatives(content, chunks)
+            if cached:
+                clusters, summaries = cached
+            else:
+                clusters = self._select_clusters(chunks)
+                representatives = [chunks[cluster['index']] for cluster in clusters]
+                results = await self._agenerate_parallel(
+                    [self._get_map_instruction(chunk['text']) for chunk in representatives]
+                )
+                summaries = self._merge_map_results(representatives, results)
+                self._store_representatives(content, chunks, clusters, summaries)
+            return await self.llm.agenerate_with_context(
+                **self._get_budgeted_reduce_call(clusters, summaries, len(chunks), depth, style)
+            )
+        
+        if not chunk_summaries and plan['strategy'] == 'refine':
+            current_summary = await self.llm.agenerate_with_context(
+                context=chunks[0]['text'],
+                instruction=instruction,
+                style=style,
+                max_tokens=max_tokens
+            )
+            for chunk in chunks[1:]:
+                refine_instruction = self._get_refine_instruction(instruction, current_summary, chunk['text'])
+                current_summary = await self.llm.agenerate(refine_instruction, max_tokens=max_tokens)
+            return current_summary
+        
+        if not chunk_summaries:
+            chunk_summaries = await self._amap_chunks(chunks)
+            self._store_chunk_summaries(content, chunks, chunk_summaries)
+        
+        chunk_summaries = await self._acollapse_summaries(self._drop_duplicates(chunk_summaries), max_tokens)
+        
+        return await self.llm.agenerate_with_context(
+            context="\n\n".join(chunk_summaries),
             instruction=instruction,
-            style=style
+            style=style,
+            max_tokens=max_tokens
+        )
+    
+    async def _amap_chunks(self, chunks: List[Dict]) -> List[str]:
+        """Async map phase; concurrency is capped by the provider's semaphore"""
+        canonical = self._find_duplicates(chunks)
+        unique = [chunk for index, chunk in enumerate(chunks) if canonical[index] == index]
+        
+        results = await self._agenerate_parallel(
+            [self._get_map_instruction(chunk['text']) for chunk in unique]
         )
+        return self._expand_duplicates(canonical, self._merge_map_results(unique, results))
+    
+    async def _agenerate_parallel(self, instructions: List[str]) -> List[Optional[str]]:
+        """Async counterpart of _generate_parallel()"""
+        async def run(index: int, instruction: str) -> Optional[str]:
+            for attempt in range(2):
+                try:
+                    return await self.llm.agenerate(instruction, max_tokens=Config.MAP_OUTPUT_TOKENS)
+                except Exception as e:
+                    error = e
+            print(f"Parallel call {index} failed: {error}")
+            return None
+        
+        return list(await asyncio.gather(
+            *(run(index, instruction) for index, instruction in enumerate(instructions))
+        ))
+    
+    async def _acollapse_summaries(self, summaries: List[str], output_tokens: int) -> List[str]:
+        """Async counterpart of _collapse_summaries()"""
+        batches = self._batch_summaries(summaries, output_tokens)
+        
+        while batches:
+            results = await self._agenerate_parallel(
+                [self._get_collapse_instruction(batch) for batch in batches]
+            )
+            summaries = self._merge_collapse_results(batches, results)
+            batches = self._batch_summaries(summaries, output_tokens)
         
-        # Subsequent passes: refine with additional chunks
-        for chunk in chunks[1:]:
-            refine_instruction = f"""{instruction}
+        return summaries
+    
+    def _get_map_instruction(self, text: str) -> str:
+        """Instruction for summarizing a single chunk in the map phase"""
+        return (
+            "Summarize the following content concisely, preserving key points, "
+            "claims, named entities (people, organizations, products) and figures:"
+            f"\n\n{text}"
+        )
+    
+    def _get_collapse_instruction(self, summaries: List[str]) -> str:
+        """Instruction for merging partial summaries in the tree reduce"""
+        joined = "\n\n".join(summaries)
+        return f"""Combine the following partial summaries of consecutive parts of one document into a single consolidated summary. Preserve key points, claims, names and figures; remove repetition.
+
+{joined}"""
+    
+    def _get_refine_instruction(self, instruction: str, current_summary: str, text: str) -> str:
+        """Instruction for folding another chunk into a running summary"""
+        return f"""{instruction}
 
 Previous summary:
 {current_summary}
 
 Additional content:
-{chunk['text']}
+{text}
 
 Refine and expand the previous summary to incorporate this new information."""
-            
-            current_summary = self.llm.generate(refine_instruction)
-        
-        return current_summary
     
-    def _map_reduce_summarize(self, content: str, depth: str, style: str) -> str:
-        """Map-reduce for very long content"""
-        chunks = self.processor.chunk_text(content)
-        
-        # Map: Summarize each chunk
-        chunk_summaries = []
-        for chunk in chunks:
-            instruction = f"Summarize the following content concisely, preserving key points:\n\n{chunk['text']}"
-            summary = self.llm.generate(instruction)
-            chunk_summaries.append(summary)
-        
-        # Reduce: Combine summaries
-        combined = "\n\n".join(chunk_summaries)
-        instruction = self._get_instruction(depth, style)
-        
-        return self.llm.generate_with_context(
-            context=combined,
-            instruction=instruction,
-            style=style
-        )
+    def _get_output_tokens(self, depth: str) -> int:
+        """Output limit for a summary of this depth"""
+        return Config.DEPTH_OUTPUT_TOKENS.get(depth, Config.DEFAULT_OUTPUT_TOKENS)
     
     def _get_instruction(self, depth: str, style: str) -> str:
         """Generate instruction based on depth and style"""
@@ -126,56 +729,303 @@ Refine and expand the previous summary to incorporate this new information."""
         
         return f"{base_instruction} {modifier}".strip()
     
-    def extract_insights(self, content: str) -> str:
-        """Extract key insights, arguments, and claims"""
-        instruction = """Analyze this content and extract:
-
-1. Key Ideas: Main concepts and themes
-2. Arguments: Primary arguments made
-3. Evidence: Supporting evidence provided
-4. Implications: What this means or suggests
-5. Limitations: Any gaps or limitations noted
-
-Be specific and cite relevant points."""
+    def summarize_sections(self, sections: List[Dict]) -> Iterator[Dict]:
+        """
+        Summarize timestamped transcript sections in parallel
+        
+        Yields each section as soon as its summary is ready (cached sections
+        first), so callers can show progress on long videos. A section whose
+        call fails twice is replaced by a raw excerpt.
+        
+        Yields: {'index': int, 'start_time': float, 'timestamp': str, 'summary': str}
+        """
+        def result(index: int, summary: str) -> Dict:
+            start_time = sections[index]['start_time']
+            return {
+                'index': index,
+                'start_time': start_time,
+                'timestamp': YouTubeExtractor.format_timestamp(start_time),
+                'summary': summary
+            }
+        
+        pending = []
+        for index, section in enumerate(sections):
+            cached = self.chunk_cache.get(self._section_key(section['text'])) if self.chunk_cache else None
+            if cached is not None:
+                yield result(index, cached)
+            else:
+                pending.append(index)
+        
+        if not pending:
+            return
+        
+        failed = 0
+        with ThreadPoolExecutor(max_workers=self._get_map_concurrency(len(pending))) as executor:
+            futures = {
+                executor.submit(
+                    self._generate_with_retry, index, self._get_map_instruction(sections[index]['text'])
+                ): index
+                for index in pending
+            }
+            
+            for future in as_completed(futures):
+                index = futures[future]
+                summary = future.result()
+                text = sections[index]['text']
+                
+                if summary is None:
+                    failed += 1
+                    summary = f"{FAILED_CHUNK_MARKER}\n{text[:FAILED_EXCERPT_CHARS]}"
+                elif self.chunk_cache:
+                    self.chunk_cache.set(self._section_key(text), summary)
+                
+                yield result(index, summary)
+        
+        if failed == len(sections):
+            raise Exception("Summarization failed for every section")
+    
+    def synthesize_sections(self, 
+                            section_summaries: List[Dict], 
+                            depth: str = "Executive Summary",
+                            style: str = "Executive Tone",
+                            stream: bool = False,
+                            use_cache: bool = True) -> Union[str, Iterator[str]]:
+        """
+        Overall summary from section summaries (as yielded by summarize_sections)
+        
+        Only the reduce step runs, so changing depth or style is a single call.
+        use_cache=False bypasses the response cache for that call.
+        """
+        ordered = sorted(section_summaries, key=lambda section: section['index'])
+        max_tokens = self._get_output_tokens(depth)
+        parts = self._collapse_summaries(
+            [f"[{section['timestamp']}] {section['summary']}" for section in ordered],
+            max_tokens
+        )
+        
+        final_call = {
+            'context': "\n\n".join(parts),
+            'instruction': (
+                f"{self._get_instruction(depth, style)} "
+                "The content is a sequence of timestamped section summaries of one video; "
+                "refer to timestamps where they help the reader."
+            ),
+            'style': style,
+            'max_tokens': max_tokens,
+            'use_cache': use_cache
+        }
+        
+        if stream:
+            return self.llm.stream_with_context(**final_call)
+        return self.llm.generate_with_context(**final_call)
+    
+    def _section_key(self, text: str) -> str:
+        """Cache key for one section summary, tied to model and map prompt"""
+        payload = json.dumps([
+            'section',
+            hashlib.sha256(text.encode('utf-8')).hexdigest(),
+            self.llm.provider,
+            self.llm.get_model_name(),
+            self._get_map_instruction("")
+        ])
+        return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+    
+    def build_digest(self, content: str, output_tokens: int = Config.DEFAULT_OUTPUT_TOKENS) -> str:
+        """
+        Compact stand-in for long content, shared by insights, questions and transform
+        
+        Built from the (cached) chunk-level map summaries, which keep key
+        claims and entities, and collapsed to fit one call whose output limit
+        is output_tokens. Content is compressed as plan() does, so summaries
+        mapped for the summary are reused. Content that fits such a call is
+        returned (compressed) unless its chunk summaries are already cached.
+        When mapping every chunk would exceed Config.PLANNER_MAX_CALLS, the
+        budgeted strategy's representative summaries are used instead.
+        """
+        content, token_count = self._compress(content, self.processor.count_tokens(content), output_tokens)
+        chunks = self.processor.chunk_text(content)
+        chunk_summaries = self._load_chunk_summaries(content, chunks)
+        representatives = None if chunk_summaries else self._load_representatives(content, chunks)
+        
+        if not chunk_summaries and not representatives:
+            if token_count <= self.planner.get_stuff_budget(output_tokens):
+                return content
+            
+            estimates = self.planner.plan(
+                token_count=token_count,
+                chunks=chunks,
+                concurrency=self._get_map_concurrency(len(chunks)),
+                summary_output_tokens=output_tokens
+            )['estimates']
+            if estimates['map_reduce']['fits']:
+                chunk_summaries = self._map_chunks(chunks)
+                self._store_chunk_summaries(content, chunks, chunk_summaries)
+            else:
+                representatives = self._get_representatives(content, chunks)
+        
+        if chunk_summaries:
+            summaries = self._drop_duplicates(chunk_summaries)
+        else:
+            summaries = self._label_representatives(*representatives, len(chunks))
+        parts = self._collapse_summaries(summaries, output_tokens)
+        
+        return "\n\n".join(
+            f"[Part {i} of {len(parts)}]\n{part}" for i, part in enumerate(parts, 1)
+        )
+    
+    def extract_insights(self, content: str, use_cache: bool = True) -> str:
+        """Extract key insights, arguments, and claims (use_cache=False bypasses the response cache)"""
+        max_tokens = Config.TASK_OUTPUT_TOKENS["insights"]
         
         return self.llm.generate_with_context(
-            context=content,
-            instruction=instruction
+            context=self.build_digest(content, max_tokens),
+            instruction=INSIGHTS_INSTRUCTION,
+            use_cache=use_cache,
+            max_tokens=max_tokens
         )
     
     def generate_questions(self, content: str, question_type: str = "study") -> str:
         """Generate questions from content"""
-        instructions = {
-            "study": "Generate 10 study questions that test understanding of this content.",
-            "discussion": "Generate 5 thought-provoking discussion questions.",
-            "interview": "Generate potential interview questions based on this content.",
-            "mcq": "Generate 5 multiple-choice questions with 4 options each (mark correct answer)."
-        }
-        
-        instruction = instructions.get(question_type, instructions["study"])
+        instruction = QUESTION_INSTRUCTIONS.get(question_type, QUESTION_INSTRUCTIONS["study"])
+        max_tokens = Config.TASK_OUTPUT_TOKENS["questions"]
         
         return self.llm.generate_with_context(
-            context=content,
-            instruction=instruction
+            context=self.build_digest(content, max_tokens),
+            instruction=instruction,
+            max_tokens=max_tokens
         )
     
     def transform_content(self, content: str, format_type: str) -> str:
         """Transform content into different formats"""
-        instructions = {
-            "blog": "Transform this into a well-structured blog post with introduction, body sections, and conclusion.",
-            "linkedin": "Create an engaging LinkedIn post (max 1300 characters) with relevant hashtags.",
-            "email": "Draft a professional email summarizing this content.",
-            "meeting_notes": "Format this as structured meeting notes with action items.",
-            "notion": "Create a Notion-style structured document with headers, sections, and bullet points."
+        instruction = TRANSFORM_INSTRUCTIONS.get(format_type, TRANSFORM_INSTRUCTIONS["blog"])
+        max_tokens = Config.TASK_OUTPUT_TOKENS["transform"]
+        
+        return self.llm.generate_with_context(
+            context=self.build_digest(content, max_tokens),
+            instruction=instruction,
+            max_tokens=max_tokens
+        )
+    
+    def generate_bundle(self, 
+                        content: str, 
+                        depth: str = "Executive Summary",
+                        style: str = "Executive Tone",
+                        question_type: str = "study",
+                        format_type: Optional[str] = None,
+                        token_count: Optional[int] = None) -> Dict[str, str]:
+        """
+        Summary, insights and questions (and optionally a transform) from one call
+        
+        The model is asked for a JSON object with one field per output. Any
+        field that is missing or unparseable falls back to its own call.
+        
+        Returns: {'summary': str, 'insights': str, 'questions': str[, 'transform': str]}
+        """
+        tasks = {
+            'summary': self._get_instruction(depth, style),
+            'insights': INSIGHTS_INSTRUCTION,
+            'questions': QUESTION_INSTRUCTIONS.get(question_type, QUESTION_INSTRUCTIONS["study"])
         }
+        if format_type:
+            tasks['transform'] = TRANSFORM_INSTRUCTIONS.get(format_type, TRANSFORM_INSTRUCTIONS["blog"])
         
-        instruction = instructions.get(format_type, instructions["blog"])
+        max_tokens = self._get_bundle_output_tokens(depth, list(tasks))
         
-        return self.llm.generate_with_context(
-            context=content,
-            instruction=instruction
+        results = {}
+        if not self.bundle_fits(depth, format_type):
+            print("Bundle output does not fit one call for this model; using individual calls")
+        else:
+            try:
+                # Full content when one call can take it, otherwise the shared digest
+                response = self.llm.generate_with_context(
+                    context=self.build_digest(content, max_tokens),
+                    instruction=self._get_bundle_instruction(tasks),
+                    max_tokens=max_tokens
+                )
+                results = self._parse_bundle(response, list(tasks))
+            except Exception as e:
+                print(f"Bundle generation failed: {e}")
+        
+        # Fall back to individual calls only for missing parts
+        fallbacks = {
+            'summary': lambda: self.summarize(content, depth, style, token_count=token_count),
+            'insights': lambda: self.extract_insights(content),
+            'questions': lambda: self.generate_questions(content, question_type),
+            'transform': lambda: self.transform_content(content, format_type)
+        }
+        for key in tasks:
+            if key not in results:
+                results[key] = fallbacks[key]()
+        
+        return results
+    
+    def bundle_fits(self, depth: str, format_type: Optional[str] = None) -> bool:
+        """Whether one call to this model has room for a bundle's output and its content digest"""
+        tasks = ['summary', 'insights', 'questions'] + (['transform'] if format_type else [])
+        max_tokens = self._get_bundle_output_tokens(depth, tasks)
+        
+        return self.planner.get_stuff_budget(max_tokens) >= Config.MAP_OUTPUT_TOKENS
+    
+    def _get_bundle_output_tokens(self, depth: str, tasks: List[str]) -> int:
+        """Room for every part's output, within what the model can generate"""
+        return min(
+            self._get_output_tokens(depth) + sum(
+                Config.TASK_OUTPUT_TOKENS[task] for task in tasks if task != 'summary'
+            ),
+            self.llm.capabilities["max_output_tokens"]
         )
     
+    def _get_bundle_instruction(self, tasks: Dict[str, str]) -> str:
+        """Instruction asking for all tasks as fields of one JSON object"""
+        task_list = "\n\n".join(
+            f'"{key}": {instruction}' for key, instruction in tasks.items()
+        )
+        keys = ", ".join(f'"{key}"' for key in tasks)
+        
+        return f"""Complete each of the following tasks on the content:
+
+{task_list}
+
+Respond with only a JSON object with the keys {keys}. Each value must be a single string containing that task's complete answer in Markdown. Do not add any text outside the JSON object."""
+    
+    def _parse_bundle(self, response: str, keys: List[str]) -> Dict[str, str]:
+        """
+        Extract task outputs from a JSON-ish response
+        
+        Tolerates code fences and surrounding prose; when the object as a
+        whole does not parse, salvages individual string fields.
+        """
+        text = re.sub(r'^```(?:json)?\s*|\s*```$', '', response.strip())
+        
+        data = None
+        start, end = text.find('{'), text.rfind('}')
+        if start != -1 and end > start:
+            try:
+                data = json.loads(text[start:end + 1], strict=False)
+            except ValueError:
+                data = None
+        
+        results = {}
+        for key in keys:
+            value = data.get(key) if isinstance(data, dict) else None
+            
+            if value is None:
+                # The closing quote must end the value, else it was cut off by an unescaped quote
+                match = re.search(rf'"{key}"\s*:\s*"((?:[^"\\]|\\.)*)"\s*[,}}]', text, re.S)
+                if match:
+                    try:
+                        value = json.loads(f'"{match.group(1)}"', strict=False)
+                    except ValueError:
+                        value = None
+            
+            if isinstance(value, list):
+                value = "\n".join(f"- {item}" for item in value)
+            
+            if isinstance(value, str) and value.strip():
+                results[key] = value.strip()
+        
+        return results
+    
     def compare_sources(self, sources: List[Dict[str, str]]) -> str:
         """Compare multiple sources"""
         # Format sources
@@ -0,0 +1,209 @@
+"""
+Persistent HTTP cache for fetched web pages
+Stores each page's body, validators and extracted text so unchanged pages
+are revalidated with a conditional GET instead of re-downloaded and re-parsed
+"""
+
+import json
+import re
+import sqlite3
+import threading
+import time
+import zlib
+from pathlib import Path
+from typing import Dict, Optional
+from src.config import Config
+
+class PageCache:
+    """SQLite store of pages with ETag/Last-Modified validators and size-bounded LRU eviction"""
+
+    _shared: Optional["PageCache"] = None
+    _shared_lock = threading.Lock()
+
+    def __init__(self, path: Optional[str] = None, max_bytes: Optional[int] = None):
+        """
+        Initialize page cache
+
+        Args:
+            path: SQLite database file
+            max_bytes: Total stored size (compressed bodies plus extracted text) before LRU eviction
+        """
+        self.path = Path(path or Config.PAGE_CACHE_PATH)
+        self.max_bytes = Config.PAGE_CACHE_MAX_BYTES if max_bytes is None else max_bytes
+
+        self.fresh_hits = 0
+        self.revalidated = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(str(self.path), timeout=30, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS pages (
+                url TEXT PRIMARY KEY,
+                etag TEXT,
+                last_modified TEXT,
+                body BLOB NOT NULL,
+                result TEXT NOT NULL,
+                fetched_at REAL NOT NULL,
+                max_age REAL NOT NULL,
+                size INTEGER NOT NULL,
+                last_accessed REAL NOT NULL
+            )
+        """)
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_pages_accessed ON pages(last_accessed)")
+        self._conn.commit()
+
+    @classmethod
+    def get_shared(cls) -> Optional["PageCache"]:
+        """Get the process-wide page cache, or None if disabled"""
+        if not Config.PAGE_CACHE_ENABLED:
+            return None
+
+        with cls._shared_lock:
+            if cls._shared is None:
+                try:
+                    cls._shared = cls()
+                except (sqlite3.Error, OSError) as e:
+                    print(f"Page cache unavailable: {e}. Continuing without cache.")
+                    return None
+            return cls._shared
+
+    @staticmethod
+    def parse_cache_control(headers) -> Optional[float]:
+        """
+        Freshness lifetime in seconds from response headers
+
+        Returns None for no-store (do not cache), 0 when the page must be
+        revalidated before reuse, else max-age minus the response's Age.
+        """
+        directives = {}
+        for part in headers.get('Cache-Control', '').lower().split(','):
+            name, _, value = part.strip().partition('=')
+            if name:
+                directives[name] = value.strip('"')
+
+        if 'no-store' in directives:
+            return None
+        if 'no-cache' in directives or not re.fullmatch(r'\d+', directives.get('max-age', '')):
+            return 0.0
+
+        age = headers.get('Age', '0')
+        age = int(age) if age.isdigit() else 0
+        return float(max(0, int(directives['max-age']) - age))
+
+    def get(self, url: str) -> Optional[Dict]:
+        """
+        Cached page for a URL, or None
+
+        Returns: {'etag', 'last_modified', 'result', 'fresh'} where
+        fresh means the page may be used without revalidation. The stored
+        body is not loaded; use get_body() for it
+        """
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT etag, last_modified, result, fetched_at, max_age FROM pages WHERE url = ?",
+                (url,)
+            ).fetchone()
+
+            if row is None:
+                self.misses += 1
+                return None
+
+            self._conn.execute("UPDATE pages SET last_accessed = ? WHERE url = ?", (time.time(), url))
+            self._conn.commit()
+
+        etag, last_modified, result, fetched_at, max_age = row
+        fresh = time.time() - fetched_at < max_age
+        if fresh:
+            self.fresh_hits += 1
+
+        return {
+            'etag': etag,
+            'last_modified': last_modified,
+            'result': json.loads(result),
+            'fresh': fresh
+        }
+
+    def get_body(self, url: str) -> Optional[bytes]:
+        """Stored (decompressed) body for a URL, or None"""
+        with self._lock:
+            row = self._conn.execute("SELECT body FROM pages WHERE url = ?", (url,)).fetchone()
+
+        return zlib.decompress(row[0]) if row else None
+
+    def set(self,
+            url: str,
+            body: bytes,
+            etag: Optional[str],
+            last_modified: Optional[str],
+            max_age: float,
+            result: Dict):
+        """Store a fetched page and its extraction, then evict LRU pages beyond max_bytes"""
+        compressed = zlib.compress(body)
+        serialized = json.dumps(result)
+        now = time.time()
+
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO pages "
+                "(url, etag, last_modified, body, result, fetched_at, max_age, size, last_accessed) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (url, etag, last_modified, compressed, serialized, now, max_age,
+                 len(compressed) + len(serialized), now)
+            )
+            self._evict()
+            self._conn.commit()
+
+    def refresh(self, url: str, max_age: float):
+        """Record a successful revalidation (304): the stored page is fresh again"""
+        with self._lock:
+            self._conn.execute(
+                "UPDATE pages SET fetched_at = ?, max_age = ? WHERE url = ?",
+                (time.time(), max_age, url)
+            )
+            self._conn.commit()
+        self.revalidated += 1
+
+    def delete(self, url: str):
+        """Drop a page (e.g. when the server starts sending no-store)"""
+        with self._lock:
+            self._conn.execute("DELETE FROM pages WHERE url = ?", (url,))
+            self._conn.commit()
+
+    def _evict(self):
+        """Delete least recently used pages until the total size is within max_bytes"""
+        total = self._conn.execute("SELECT COALESCE(SUM(size), 0) FROM pages").fetchone()[0]
+        if not self.max_bytes or total <= self.max_bytes:
+            return
+
+        excess = total - self.max_bytes
+        victims = []
+        for url, size in self._conn.execute("SELECT url, size FROM pages ORDER BY last_accessed"):
+            victims.append((url,))
+            excess -= size
+            if excess <= 0:
+                break
+        self._conn.executemany("DELETE FROM pages WHERE url = ?", victims)
+
+    def clear(self):
+        """Remove all cached pages"""
+        with self._lock:
+            self._conn.execute("DELETE FROM pages")
+            self._conn.commit()
+
+    def get_stats(self) -> Dict[str, float]:
+        """Get fresh hit / revalidation / miss counters and current size"""
+        with self._lock:
+            entries, size = self._conn.execute(
+                "SELECT COUNT(*), COALESCE(SUM(size), 0) FROM pages"
+            ).fetchone()
+
+        return {
+            "fresh_hits": self.fresh_hits,
+            "revalidated": self.revalidated,
+            "misses": self.misses,
+            "entries": entries,
+            "bytes": size
+        }
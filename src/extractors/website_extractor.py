@@ -1,11 +1,20 @@
 """
-Website content extraction using BeautifulSoup
+Website content extraction using lxml
+Pages are streamed into an incremental parser under a byte cap
 """
 
-import requests
-from bs4 import BeautifulSoup
-from typing import Dict, Optional
+import codecs
 import re
+import requests
+import lxml.html
+from lxml import etree
+from typing import Dict, Iterable, Iterator, List, Optional
+from src.config import Config
+from src.extractors.page_cache import PageCache
+from src.utils.http_client import HTTPClient
+
+class PageTooLargeError(Exception):
+    """Raised mid-download when a page passes Config.WEBSITE_MAX_BYTES"""
 
 class WebsiteExtractor:
     """Extract clean content from websites"""
@@ -22,6 +31,35 @@ class WebsiteExtractor:
         'popup', 'modal', 'newsletter', 'subscribe', 'social'
     ]
     
+    # REMOVE_CLASSES matched as whole class words ('ad-slot', 'top_ads'), so 'header' or 'thread' are kept
+    REMOVE_CLASS_PATTERN = re.compile(
+        r'(?:^|[\s_-])(?:' + '|'.join(REMOVE_CLASSES) + r')s?(?=$|[\s_-])', re.I
+    )
+    
+    # Inline elements: their text belongs to the enclosing text block
+    INLINE_TAGS = frozenset([
+        'a', 'abbr', 'b', 'bdi', 'bdo', 'br', 'cite', 'code', 'data', 'dfn', 'em', 'font',
+        'i', 'kbd', 'mark', 'q', 's', 'samp', 'small', 'span', 'strong', 'sub', 'sup',
+        'time', 'u', 'var', 'wbr'
+    ])
+    
+    # Elements that can be chosen as the main content container
+    CANDIDATE_TAGS = frozenset(['article', 'main', 'section', 'div', 'table', 'td', 'body'])
+    
+    # Text blocks shorter than this, or mostly link text, count as boilerplate
+    MIN_BLOCK_CHARS = 25
+    MAX_BLOCK_LINK_RATIO = 0.5
+    
+    # Score multiplier for <article>/<main> and content-like classes
+    CONTENT_BONUS = 1.25
+    CONTENT_CLASS_PATTERN = re.compile(r'content|article|post|entry', re.I)
+    
+    # Content types parsed as HTML; text/plain is used as is, anything else is rejected
+    HTML_CONTENT_TYPES = ('text/html', 'application/xhtml+xml')
+    
+    # <meta charset="..."> or http-equiv Content-Type, looked for in the first chunk
+    META_CHARSET = re.compile(rb'<meta[^>]+charset=["\']?([\w.:-]+)', re.I)
+    
     @staticmethod
     def extract_content(url: str) -> Dict:
         """
@@ -34,89 +72,71 @@ class WebsiteExtractor:
         }
         """
         try:
-            # Fetch page
-            headers = {
-                'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'
-            }
-            
-            response = requests.get(url, headers=headers, timeout=10)
-            response.raise_for_status()
+            cache = PageCache.get_shared()
+            cached = cache.get(url) if cache else None
+            if cached and cached['fresh']:
+                return cached['result']
             
-            # Parse HTML
-            soup = BeautifulSoup(response.content, 'lxml')
+            # Revalidate a stored copy; 304 means it can be reused as is
+            headers = {}
+            if cached and cached['etag']:
+                headers['If-None-Match'] = cached['etag']
+            if cached and cached['last_modified']:
+                headers['If-Modified-Since'] = cached['last_modified']
             
-            # Extract title
-            title = None
-            if soup.title:
-                title = soup.title.string.strip()
-            elif soup.find('h1'):
-                title = soup.find('h1').get_text().strip()
+            # Fetch page over pooled keep-alive connections; the body is streamed
+            response = HTTPClient.get_shared().get(url, headers=headers, stream=True)
             
-            # Remove unwanted tags
-            for tag in WebsiteExtractor.REMOVE_TAGS:
-                for element in soup.find_all(tag):
-                    element.decompose()
+            # Closing before the body is fully read drops the connection instead of draining it
+            with response:
+                max_age = PageCache.parse_cache_control(response.headers)
+                
+                if response.status_code == 304 and cached:
+                    if max_age is None:
+                        cache.delete(url)
+                    else:
+                        cache.refresh(url, max_age)
+                    return cached['result']
+                
+                response.raise_for_status()
+                
+                content_type, charset = WebsiteExtractor.parse_content_type(response.headers)
+                if content_type not in WebsiteExtractor.HTML_CONTENT_TYPES and content_type != 'text/plain':
+                    return {
+                        'success': False,
+                        'content': None,
+                        'title': None,
+                        'error': f"Unsupported content type '{content_type}' - only web pages and plain text can be summarized"
+                    }
+                
+                # Reject oversized pages before reading any of the body
+                max_bytes = Config.WEBSITE_MAX_BYTES
+                length = response.headers.get('Content-Length', '')
+                if length.isdigit() and int(length) > max_bytes:
+                    return WebsiteExtractor._too_large(max_bytes)
+                
+                # Chunks are decoded and parsed as they arrive
+                body = []
+                chunks = WebsiteExtractor._read_limited(response, body, max_bytes)
+                try:
+                    if content_type == 'text/plain':
+                        result = WebsiteExtractor.parse_text(chunks, charset)
+                    else:
+                        result = WebsiteExtractor.parse_html(chunks, charset)
+                except PageTooLargeError:
+                    return WebsiteExtractor._too_large(max_bytes)
             
-            # Remove elements with ad-related classes
-            for element in soup.find_all(class_=re.compile('|'.join(WebsiteExtractor.REMOVE_CLASSES), re.I)):
-                element.decompose()
+            if cache:
+                etag = response.headers.get('ETag')
+                last_modified = response.headers.get('Last-Modified')
+                
+                # Worth keeping only if it can be revalidated or is fresh for a while
+                if result['success'] and max_age is not None and (etag or last_modified or max_age > 0):
+                    cache.set(url, b"".join(body), etag, last_modified, max_age, result)
+                elif cached:
+                    cache.delete(url)
             
-            # Try to find main content
-            main_content = None
-            
-            # Strategy 1: Look for <article> tag
-            article = soup.find('article')
-            if article:
-                main_content = article
-            
-            # Strategy 2: Look for main content containers
-            if not main_content:
-                for tag in ['main', 'div']:
-                    for class_name in ['content', 'main-content', 'article', 'post', 'entry']:
-                        element = soup.find(tag, class_=re.compile(class_name, re.I))
-                        if element:
-                            main_content = element
-                            break
-                    if main_content:
-                        break
-            
-            # Strategy 3: Use body if nothing else found
-            if not main_content:
-                main_content = soup.find('body')
-            
-            if not main_content:
-                return {
-                    'success': False,
-                    'content': None,
-                    'title': None,
-                    'error': "Could not extract main content from page"
-                }
-            
-            # Extract and clean text
-            text = main_content.get_text(separator='\n', strip=True)
-            
-            # Clean up text
-            lines = [line.strip() for line in text.split('\n') if line.strip()]
-            text = '\n'.join(lines)
-            
-            # Remove excessive whitespace
-            text = re.sub(r'\n{3,}', '\n\n', text)
-            
-            # Basic validation
-            if len(text) < 100:
-                return {
-                    'success': False,
-                    'content': None,
-                    'title': title,
-                    'error': "Extracted content too short (possible paywall or extraction issue)"
-                }
-            
-            return {
-                'success': True,
-                'content': text,
-                'title': title,
-                'error': None
-            }
+            return result
             
         except requests.exceptions.Timeout:
             return {
@@ -137,6 +157,271 @@ class WebsiteExtractor:
                 'error': f"Error extracting content: {str(e)}"
             }
     
+    @staticmethod
+    def parse_content_type(headers) -> tuple:
+        """Media type and charset (or None) from a Content-Type header; missing means HTML"""
+        media_type, _, params = headers.get('Content-Type', 'text/html').partition(';')
+        match = re.search(r'charset=["\']?([\w.:-]+)', params, re.I)
+        return media_type.strip().lower() or 'text/html', match.group(1) if match else None
+    
+    @staticmethod
+    def _read_limited(response, body: List[bytes], max_bytes: int) -> Iterator[bytes]:
+        """
+        Yield decompressed body chunks, also collecting them into body
+        
+        Raises PageTooLargeError as soon as the total passes max_bytes, which
+        aborts parsing and leaves the rest of the body unread.
+        """
+        size = 0
+        for chunk in response.iter_content(chunk_size=Config.WEBSITE_READ_CHUNK_BYTES):
+            size += len(chunk)
+            if size > max_bytes:
+                raise PageTooLargeError(f"{size} bytes read")
+            body.append(chunk)
+            yield chunk
+    
+    @staticmethod
+    def _too_large(max_bytes: int) -> Dict:
+        """Result for pages beyond the download cap"""
+        return {
+            'success': False,
+            'content': None,
+            'title': None,
+            'error': f"Page is larger than the {max_bytes // (1024 * 1024)} MB download limit"
+        }
+    
+    @staticmethod
+    def _decode(chunks: Iterable[bytes], charset: Optional[str] = None) -> Iterator[str]:
+        """
+        Incrementally decode byte chunks
+        
+        The charset comes from the Content-Type header, else a <meta> tag in
+        the first chunk, else UTF-8 (a BOM is honoured). Undecodable bytes
+        are replaced rather than failing the page.
+        """
+        decoder = None
+        for chunk in chunks:
+            if decoder is None:
+                if not charset:
+                    match = WebsiteExtractor.META_CHARSET.search(chunk)
+                    charset = match.group(1).decode('ascii') if match else None
+                try:
+                    codec = codecs.lookup(charset or 'utf-8-sig')
+                except LookupError:
+                    codec = codecs.lookup('utf-8-sig')
+                if codec.name == 'utf-8':
+                    codec = codecs.lookup('utf-8-sig')
+                decoder = codec.incrementaldecoder(errors='replace')
+            
+            text = decoder.decode(chunk)
+            if text:
+                yield text
+        
+        if decoder is not None:
+            text = decoder.decode(b'', final=True)
+            if text:
+                yield text
+    
+    @staticmethod
+    def parse_html(html, charset: Optional[str] = None) -> Dict:
+        """
+        Extract title and main text from an HTML document
+        
+        Args:
+            html: Document bytes, or an iterable of byte chunks fed to the
+                parser as they arrive
+            charset: Encoding from the response headers, if known
+        
+        Returns the same dict as extract_content
+        """
+        if isinstance(html, bytes):
+            html = [html]
+        
+        parser = lxml.html.HTMLParser()
+        for text in WebsiteExtractor._decode(html, charset):
+            parser.feed(text)
+        
+        try:
+            root = parser.close()
+        except etree.LxmlError:
+            root = None
+        
+        if root is None:
+            return {
+                'success': False,
+                'content': None,
+                'title': None,
+                'error': "Could not extract main content from page"
+            }
+        
+        cleaned = WebsiteExtractor.clean_document(root)
+        title = cleaned['title']
+        main_content = cleaned['content']
+        
+        if main_content is None:
+            return {
+                'success': False,
+                'content': None,
+                'title': None,
+                'error': "Could not extract main content from page"
+            }
+        
+        # Extract text, one line per text node
+        text = '\n'.join(part.strip() for part in main_content.itertext() if part.strip())
+        
+        return WebsiteExtractor._build_result(text, title)
+    
+    @staticmethod
+    def clean_document(root) -> Dict:
+        """
+        Remove boilerplate and locate the main content in one traversal
+        
+        Elements in REMOVE_TAGS or with ad-like classes are skipped and then
+        dropped (text after them is kept). Every other element sums, over its
+        subtree, characters of text, of link text, and of good text: runs of
+        text directly inside one block, inline children included, that are at
+        least MIN_BLOCK_CHARS long and not mostly links. A candidate's score
+        is its share of the page's good text times its text density (good
+        text over all its text), so the smallest container holding most of
+        the article beats both <body> and link-heavy navigation. Blocks with
+        no good text that are mostly links (navboxes, share bars) are then
+        dropped from inside it.
+        
+        Returns: {'title': Optional[str], 'content': element or None}
+        """
+        remove_tags = frozenset(WebsiteExtractor.REMOVE_TAGS)
+        inline_tags = WebsiteExtractor.INLINE_TAGS
+        candidate_tags = WebsiteExtractor.CANDIDATE_TAGS
+        remove_class = WebsiteExtractor.REMOVE_CLASS_PATTERN.search
+        min_block = WebsiteExtractor.MIN_BLOCK_CHARS
+        max_link_ratio = WebsiteExtractor.MAX_BLOCK_LINK_RATIO
+        
+        title = None
+        heading = None
+        dropped = []
+        candidates = []
+        link_blocks = []
+        page_good = 0
+        link_depth = 0
+        
+        # Per open element: [chars, link chars, good chars, block run chars, block run link chars]
+        stack = []
+        
+        walker = etree.iterwalk(root, events=('start', 'end'))
+        for event, element in walker:
+            tag = element.tag
+            
+            if event == 'start':
+                if tag in remove_tags or remove_class(element.get('class', '')):
+                    walker.skip_subtree()
+                    dropped.append(element)
+                    stack.append(None)
+                    continue
+                
+                if tag == 'title' and title is None:
+                    title = element.text_content().strip()
+                elif tag == 'h1' and heading is None:
+                    heading = element.text_content().strip()
+                
+                if tag == 'a':
+                    link_depth += 1
+                
+                size = len(element.text.strip()) if element.text else 0
+                link = size if link_depth else 0
+                stack.append([size, link, 0, size, link])
+                continue
+            
+            totals = stack.pop()
+            tail = len(element.tail.strip()) if element.tail else 0
+            
+            if totals is None:
+                # Removed element: only its tail remains, as text of the parent
+                chars = links = good = run = run_links = 0
+            else:
+                if tag == 'a':
+                    link_depth -= 1
+                
+                chars, links, good, run, run_links = totals
+                if tag not in inline_tags:
+                    # A block ends its text run
+                    if run >= min_block and run_links <= run * max_link_ratio:
+                        good += run - run_links
+                    if good and tag in candidate_tags:
+                        candidates.append((element, chars, good))
+                    elif not good and links > chars * max_link_ratio:
+                        link_blocks.append(element)
+                    run = run_links = 0
+            
+            if not stack:
+                page_good = good
+                break
+            
+            tail_link = tail if link_depth else 0
+            parent = stack[-1]
+            parent[0] += chars + tail
+            parent[1] += links + tail_link
+            parent[2] += good
+            parent[3] += run + tail
+            parent[4] += run_links + tail_link
+        
+        for element in dropped:
+            element.drop_tree()
+        
+        content = None
+        best_score = 0.0
+        for element, chars, good in candidates:
+            score = good / page_good * good / chars
+            if element.tag in ('article', 'main') or \
+                    WebsiteExtractor.CONTENT_CLASS_PATTERN.search(element.get('class', '')):
+                score *= WebsiteExtractor.CONTENT_BONUS
+            if score > best_score:
+                content = element
+                best_score = score
+        
+        # Pages without any block of real text fall back to the whole body, links included
+        if content is None:
+            content = root.find('.//body')
+        else:
+            for element in link_blocks:
+                element.drop_tree()
+        
+        return {
+            'title': title if title is not None else heading,
+            'content': content
+        }
+    
+    @staticmethod
+    def parse_text(chunks: Iterable[bytes], charset: Optional[str] = None) -> Dict:
+        """Use a plain-text document as content (no title); returns the same dict as extract_content"""
+        text = ''.join(WebsiteExtractor._decode(chunks, charset))
+        return WebsiteExtractor._build_result(text, None)
+    
+    @staticmethod
+    def _build_result(text: str, title: Optional[str]) -> Dict:
+        """Normalize extracted text and reject pages with too little of it"""
+        # Clean up text
+        lines = [line.strip() for line in text.split('\n') if line.strip()]
+        text = '\n'.join(lines)
+        
+        # Remove excessive whitespace
+        text = re.sub(r'\n{3,}', '\n\n', text)
+        
+        # Basic validation
+        if len(text) < 100:
+            return {
+                'success': False,
+                'content': None,
+                'title': title,
+                'error': "Extracted content too short (possible paywall or extraction issue)"
+            }
+        
+        return {
+            'success': True,
+            'content': text,
+            'title': title,
+            'error': None
+        }
+    
     @staticmethod
     def extract_headings(content: str) -> list:
         """Extract potential section headings from content"""
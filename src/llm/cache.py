@@ -0,0 +1,163 @@
+"""
+Persistent LLM response cache
+Content-addressed SQLite store with TTL and size-bounded LRU eviction
+"""
+
+import hashlib
+import json
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Optional, Dict
+from src.config import Config
+
+class ResponseCache:
+    """Disk-backed cache for LLM responses, shared across sessions and restarts"""
+
+    _shared: Dict[str, "ResponseCache"] = {}
+    _shared_lock = threading.Lock()
+
+    def __init__(self,
+                 path: Optional[str] = None,
+                 ttl: Optional[int] = None,
+                 max_entries: Optional[int] = None,
+                 table: str = "responses"):
+        """
+        Initialize response cache
+
+        Args:
+            path: SQLite database file
+            ttl: Entry lifetime in seconds (0 disables expiry)
+            max_entries: Maximum number of entries kept before LRU eviction
+            table: Table name, so several caches can share one database
+        """
+        self.path = Path(path or Config.LLM_CACHE_PATH)
+        self.table = table
+        self.ttl = Config.LLM_CACHE_TTL if ttl is None else ttl
+        self.max_entries = Config.LLM_CACHE_MAX_ENTRIES if max_entries is None else max_entries
+
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(str(self.path), timeout=30, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(f"""
+            CREATE TABLE IF NOT EXISTS {self.table} (
+                key TEXT PRIMARY KEY,
+                value TEXT NOT NULL,
+                created_at REAL NOT NULL,
+                last_accessed REAL NOT NULL
+            )
+        """)
+        self._conn.execute(
+            f"CREATE INDEX IF NOT EXISTS idx_{self.table}_accessed ON {self.table}(last_accessed)"
+        )
+        self._conn.commit()
+
+    @classmethod
+    def get_shared(cls, table: str = "responses") -> Optional["ResponseCache"]:
+        """Get the process-wide cache for a table, or None if caching is disabled"""
+        if not Config.LLM_CACHE_ENABLED:
+            return None
+
+        with cls._shared_lock:
+            if table not in cls._shared:
+                try:
+                    cls._shared[table] = cls(table=table)
+                except (sqlite3.Error, OSError) as e:
+                    print(f"LLM cache unavailable: {e}. Continuing without cache.")
+                    return None
+            return cls._shared[table]
+
+    @staticmethod
+    def make_key(provider: str,
+                 model: str,
+                 temperature: float,
+                 system_prompt: Optional[str],
+                 prompt: str,
+                 max_tokens: Optional[int] = None) -> str:
+        """Build a content-addressed key from everything that affects the response"""
+        prompt_hash = hashlib.sha256(prompt.encode("utf-8")).hexdigest()
+        fields = [provider, model, temperature, system_prompt or "", prompt_hash]
+        if max_tokens is not None:
+            fields.append(max_tokens)
+        payload = json.dumps(fields)
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def get(self, key: str) -> Optional[str]:
+        """Return cached response or None on miss/expiry"""
+        now = time.time()
+
+        with self._lock:
+            row = self._conn.execute(
+                f"SELECT value, created_at FROM {self.table} WHERE key = ?", (key,)
+            ).fetchone()
+
+            if row is None:
+                self.misses += 1
+                return None
+
+            value, created_at = row
+            if self.ttl and now - created_at > self.ttl:
+                self._conn.execute(f"DELETE FROM {self.table} WHERE key = ?", (key,))
+                self._conn.commit()
+                self.misses += 1
+                return None
+
+            self._conn.execute(
+                f"UPDATE {self.table} SET last_accessed = ? WHERE key = ?", (now, key)
+            )
+            self._conn.commit()
+            self.hits += 1
+            return value
+
+    def set(self, key: str, value: str):
+        """Store a response and evict least recently used entries if over capacity"""
+        now = time.time()
+
+        with self._lock:
+            self._conn.execute(
+                f"INSERT OR REPLACE INTO {self.table} (key, value, created_at, last_accessed) "
+                "VALUES (?, ?, ?, ?)",
+                (key, value, now, now)
+            )
+            self._evict()
+            self._conn.commit()
+
+    def _evict(self):
+        """Drop expired entries, then least recently used ones beyond max_entries"""
+        if self.ttl:
+            self._conn.execute(
+                f"DELETE FROM {self.table} WHERE created_at < ?", (time.time() - self.ttl,)
+            )
+
+        if self.max_entries:
+            self._conn.execute(f"""
+                DELETE FROM {self.table} WHERE key IN (
+                    SELECT key FROM {self.table}
+                    ORDER BY last_accessed DESC
+                    LIMIT -1 OFFSET ?
+                )
+            """, (self.max_entries,))
+
+    def clear(self):
+        """Remove all cached responses"""
+        with self._lock:
+            self._conn.execute(f"DELETE FROM {self.table}")
+            self._conn.commit()
+
+    def get_stats(self) -> Dict[str, float]:
+        """Get hit/miss counters and current size"""
+        with self._lock:
+            size = self._conn.execute(f"SELECT COUNT(*) FROM {self.table}").fetchone()[0]
+
+        total = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / total if total else 0.0,
+            "entries": size
+        }
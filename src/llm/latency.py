@@ -0,0 +1,98 @@
+"""
+Measured LLM call latency per model
+Feeds the strategy planner's wall-time estimates
+"""
+
+import threading
+from typing import Dict, Optional, Tuple
+
+class LatencyTracker:
+    """
+    Exponentially weighted call overhead and generation speed for one model
+
+    Calls are fitted as elapsed = overhead + output_tokens * seconds_per_token
+    by weighted least squares over recent calls, so the fixed cost of a call
+    is not scaled with its output size.
+    """
+
+    _registry: Dict[str, "LatencyTracker"] = {}
+    _registry_lock = threading.Lock()
+
+    # Weight of the newest observation
+    ALPHA = 0.3
+
+    # Assumed fixed cost per call (network, queueing at the provider) before any measurement
+    DEFAULT_CALL_OVERHEAD = 0.5
+
+    # Output sizes must vary by this fraction (std / mean) before a rate is fitted from them
+    MIN_TOKEN_SPREAD = 0.1
+
+    def __init__(self, model: str):
+        self.model = model
+        self.samples = 0
+        # Weighted means, variance of output tokens and their covariance with elapsed seconds
+        self.mean_tokens = 0.0
+        self.mean_seconds = 0.0
+        self.token_variance = 0.0
+        self.covariance = 0.0
+        self._lock = threading.Lock()
+
+    @classmethod
+    def for_model(cls, model: str) -> "LatencyTracker":
+        """Get the shared tracker for a model"""
+        with cls._registry_lock:
+            if model not in cls._registry:
+                cls._registry[model] = cls(model)
+            return cls._registry[model]
+
+    def record(self, elapsed: float, output_tokens: int):
+        """Record one completed call (excluding rate-limit queue time)"""
+        with self._lock:
+            if self.samples == 0:
+                self.mean_tokens = float(output_tokens)
+                self.mean_seconds = elapsed
+            else:
+                token_delta = output_tokens - self.mean_tokens
+                seconds_delta = elapsed - self.mean_seconds
+                self.mean_tokens += self.ALPHA * token_delta
+                self.mean_seconds += self.ALPHA * seconds_delta
+                self.token_variance = (1 - self.ALPHA) * (self.token_variance + self.ALPHA * token_delta ** 2)
+                self.covariance = (1 - self.ALPHA) * (self.covariance + self.ALPHA * token_delta * seconds_delta)
+            self.samples += 1
+
+    def _fit(self, default_tokens_per_second: float) -> Tuple[float, float]:
+        """(call overhead, seconds per output token) from recorded calls; caller holds the lock"""
+        spread = self.MIN_TOKEN_SPREAD * self.mean_tokens
+        if self.token_variance > spread ** 2 and self.covariance > 0:
+            per_token = self.covariance / self.token_variance
+        else:
+            # Output sizes too similar to separate the two costs: keep the nominal speed
+            per_token = 1.0 / default_tokens_per_second
+
+        overhead = max(0.0, self.mean_seconds - per_token * self.mean_tokens)
+        return overhead, per_token
+
+    def estimate(self, output_tokens: int, default_tokens_per_second: float) -> float:
+        """Estimated seconds for a call producing `output_tokens` tokens"""
+        with self._lock:
+            if self.samples == 0:
+                overhead, per_token = self.DEFAULT_CALL_OVERHEAD, 1.0 / default_tokens_per_second
+            else:
+                overhead, per_token = self._fit(default_tokens_per_second)
+
+        return overhead + per_token * output_tokens
+
+    def get_stats(self, default_tokens_per_second: Optional[float] = None) -> Dict[str, Optional[float]]:
+        """Samples and fitted costs (None before any call, or when no default speed is given)"""
+        with self._lock:
+            stats = {
+                "samples": self.samples,
+                "mean_output_tokens": self.mean_tokens if self.samples else None,
+                "mean_seconds_per_call": self.mean_seconds if self.samples else None,
+                "call_overhead": None,
+                "seconds_per_output_token": None
+            }
+            if self.samples and default_tokens_per_second:
+                stats["call_overhead"], stats["seconds_per_output_token"] = self._fit(default_tokens_per_second)
+
+        return stats
@@ -3,9 +3,15 @@ LLM provider abstraction layer
 Supports Groq and Google Gemini with improved compatibility
 """
 
-from typing import Optional, Dict
+import asyncio
+import time
+import weakref
+from typing import Optional, Dict, List, Tuple, Iterator
 from langchain.schema import HumanMessage, SystemMessage
 from src.config import Config
+from src.llm.cache import ResponseCache
+from src.llm.latency import LatencyTracker
+from src.llm.rate_limiter import RateLimiter
 
 class LLMProvider:
     """Unified interface for different LLM providers"""
@@ -20,7 +26,14 @@ class LLMProvider:
         """
         self.provider = provider
         self.mode = mode
+        self.temperature = 0.3
         self.llm = None
+        self.cache = ResponseCache.get_shared()
+        self.last_queue_wait = 0.0
+        self._async_semaphores = weakref.WeakKeyDictionary()
+        
+        # max_tokens -> client copy with that output limit
+        self._llm_variants = {}
         
         # Auto-detect provider if needed
         if provider == "auto":
@@ -30,6 +43,11 @@ class LLMProvider:
         
         # Initialize LLM
         self._initialize_llm()
+        
+        # Shared per-model limiter and latency stats (provider may have changed during fallback)
+        self.capabilities = Config.get_model_capabilities(self.get_model_name())
+        self.rate_limiter = RateLimiter.for_model(self.provider, self.get_model_name())
+        self.latency = LatencyTracker.for_model(self.get_model_name())
     
     def _initialize_llm(self):
         """Initialize the appropriate LLM with proper error handling"""
@@ -41,8 +59,8 @@ class LLMProvider:
                 self.llm = ChatGroq(
                     groq_api_key=Config.GROQ_API_KEY,
                     model_name=model,
-                    temperature=0.3,
-                    max_tokens=4000
+                    temperature=self.temperature,
+                    max_tokens=self._default_output_tokens(model)
                 )
             
             elif self.provider == "gemini":
@@ -52,8 +70,8 @@ class LLMProvider:
                 self.llm = ChatGoogleGenerativeAI(
                     google_api_key=Config.GOOGLE_API_KEY,
                     model=model,
-                    temperature=0.3,
-                    max_output_tokens=4000
+                    temperature=self.temperature,
+                    max_output_tokens=self._default_output_tokens(model)
                 )
             
             else:
@@ -72,34 +90,133 @@ class LLMProvider:
             else:
                 raise Exception(f"LLM initialization failed: {str(e)}")
     
-    def generate(self, prompt: str, system_prompt: Optional[str] = None) -> str:
+    def _default_output_tokens(self, model: str) -> int:
+        """Output limit for calls that do not set one"""
+        return min(Config.DEFAULT_OUTPUT_TOKENS, Config.get_model_capabilities(model)["max_output_tokens"])
+    
+    def _get_llm(self, max_tokens: Optional[int] = None):
+        """Client for a call, with its output limit clamped to the model's maximum"""
+        if max_tokens is None:
+            return self.llm
+        
+        max_tokens = min(max_tokens, self.capabilities["max_output_tokens"])
+        llm = self._llm_variants.get(max_tokens)
+        if llm is None:
+            field = "max_tokens" if self.provider == "groq" else "max_output_tokens"
+            llm = self.llm.copy(update={field: max_tokens})
+            self._llm_variants[max_tokens] = llm
+        
+        return llm
+    
+    def generate(self, 
+                prompt: str, 
+                system_prompt: Optional[str] = None,
+                use_cache: bool = True,
+                max_tokens: Optional[int] = None) -> str:
         """
         Generate response from LLM
         
         Args:
             prompt: User prompt
             system_prompt: Optional system prompt
+            use_cache: Set False to bypass the response cache
+            max_tokens: Output limit for this call (default: DEFAULT_OUTPUT_TOKENS)
             
         Returns:
             Generated text
         """
-        messages = []
+        cache_key = self._get_cache_key(prompt, system_prompt, use_cache, max_tokens)
+        if cache_key:
+            cached = self.cache.get(cache_key)
+            if cached is not None:
+                return cached
         
-        if system_prompt:
-            messages.append(SystemMessage(content=system_prompt))
+        messages = self._build_messages(prompt, system_prompt)
         
-        messages.append(HumanMessage(content=prompt))
+        # Queue until the provider's request/token budget allows this call
+        prompt_tokens = RateLimiter.estimate_tokens((system_prompt or "") + prompt)
+        self.last_queue_wait = self.rate_limiter.acquire(prompt_tokens)
         
+        started = time.perf_counter()
         try:
-            response = self.llm.invoke(messages)
-            return response.content
+            response = self._get_llm(max_tokens).invoke(messages)
         except Exception as e:
             raise Exception(f"LLM generation failed: {str(e)}")
+        
+        return self._finish_response(response.content, cache_key, started)
+    
+    async def agenerate(self, 
+                       prompt: str, 
+                       system_prompt: Optional[str] = None,
+                       use_cache: bool = True,
+                       max_tokens: Optional[int] = None) -> str:
+        """
+        Async counterpart of generate()
+        
+        At most Config.ASYNC_CONCURRENCY calls per event loop are in flight;
+        the rest wait on a semaphore without blocking a thread.
+        """
+        cache_key = self._get_cache_key(prompt, system_prompt, use_cache, max_tokens)
+        if cache_key:
+            cached = self.cache.get(cache_key)
+            if cached is not None:
+                return cached
+        
+        messages = self._build_messages(prompt, system_prompt)
+        prompt_tokens = RateLimiter.estimate_tokens((system_prompt or "") + prompt)
+        
+        async with self._get_async_semaphore():
+            self.last_queue_wait = await self.rate_limiter.aacquire(prompt_tokens)
+            
+            started = time.perf_counter()
+            try:
+                response = await self._get_llm(max_tokens).ainvoke(messages)
+            except Exception as e:
+                raise Exception(f"LLM generation failed: {str(e)}")
+        
+        return self._finish_response(response.content, cache_key, started)
+    
+    def stream(self, 
+               prompt: str, 
+               system_prompt: Optional[str] = None,
+               use_cache: bool = True,
+               max_tokens: Optional[int] = None) -> Iterator[str]:
+        """
+        Stream response from LLM token by token
+        
+        Yields text fragments as they arrive. A cached response is yielded
+        whole; the full streamed text is cached once the stream completes.
+        """
+        cache_key = self._get_cache_key(prompt, system_prompt, use_cache, max_tokens)
+        if cache_key:
+            cached = self.cache.get(cache_key)
+            if cached is not None:
+                yield cached
+                return
+        
+        messages = self._build_messages(prompt, system_prompt)
+        
+        prompt_tokens = RateLimiter.estimate_tokens((system_prompt or "") + prompt)
+        self.last_queue_wait = self.rate_limiter.acquire(prompt_tokens)
+        
+        parts = []
+        started = time.perf_counter()
+        try:
+            for chunk in self._get_llm(max_tokens).stream(messages):
+                if chunk.content:
+                    parts.append(chunk.content)
+                    yield chunk.content
+        except Exception as e:
+            raise Exception(f"LLM generation failed: {str(e)}")
+        
+        self._finish_response("".join(parts), cache_key, started)
     
     def generate_with_context(self, 
                             context: str, 
                             instruction: str, 
-                            style: Optional[str] = None) -> str:
+                            style: Optional[str] = None,
+                            use_cache: bool = True,
+                            max_tokens: Optional[int] = None) -> str:
         """
         Generate response with context and instruction
         
@@ -107,10 +224,40 @@ class LLMProvider:
             context: Background context/content
             instruction: What to do with the context
             style: Optional style modifier
+            use_cache: Set False to bypass the response cache
+            max_tokens: Output limit for this call (default: DEFAULT_OUTPUT_TOKENS)
             
         Returns:
             Generated text
         """
+        prompt, system_prompt = self._build_context_prompt(context, instruction, style)
+        return self.generate(prompt, system_prompt, use_cache=use_cache, max_tokens=max_tokens)
+    
+    def stream_with_context(self, 
+                            context: str, 
+                            instruction: str, 
+                            style: Optional[str] = None,
+                            use_cache: bool = True,
+                            max_tokens: Optional[int] = None) -> Iterator[str]:
+        """Streaming counterpart of generate_with_context()"""
+        prompt, system_prompt = self._build_context_prompt(context, instruction, style)
+        yield from self.stream(prompt, system_prompt, use_cache=use_cache, max_tokens=max_tokens)
+    
+    async def agenerate_with_context(self, 
+                                    context: str, 
+                                    instruction: str, 
+                                    style: Optional[str] = None,
+                                    use_cache: bool = True,
+                                    max_tokens: Optional[int] = None) -> str:
+        """Async counterpart of generate_with_context()"""
+        prompt, system_prompt = self._build_context_prompt(context, instruction, style)
+        return await self.agenerate(prompt, system_prompt, use_cache=use_cache, max_tokens=max_tokens)
+    
+    def _build_context_prompt(self, 
+                              context: str, 
+                              instruction: str, 
+                              style: Optional[str] = None) -> Tuple[str, str]:
+        """Build (prompt, system_prompt) for a context + instruction request"""
         system_prompt = "You are an expert content analyst and summarizer."
         
         if style:
@@ -124,18 +271,80 @@ Task:
 
 Provide a clear, accurate, and well-structured response."""
         
-        return self.generate(prompt, system_prompt)
+        return prompt, system_prompt
     
-    def get_info(self) -> Dict[str, str]:
-        """Get provider information"""
-        model = ""
+    def _build_messages(self, prompt: str, system_prompt: Optional[str] = None) -> List:
+        """Build chat messages for the LLM"""
+        messages = []
+        
+        if system_prompt:
+            messages.append(SystemMessage(content=system_prompt))
+        
+        messages.append(HumanMessage(content=prompt))
+        
+        return messages
+    
+    def _get_cache_key(self, 
+                       prompt: str, 
+                       system_prompt: Optional[str], 
+                       use_cache: bool,
+                       max_tokens: Optional[int] = None) -> Optional[str]:
+        """Cache key for a request, or None if the cache is off/bypassed"""
+        if not (self.cache and use_cache):
+            return None
+        
+        return ResponseCache.make_key(
+            self.provider, self.get_model_name(), self.temperature, system_prompt, prompt, max_tokens
+        )
+    
+    def _finish_response(self, content: str, cache_key: Optional[str], started: float) -> str:
+        """Charge completion tokens, record latency and store the response in the cache"""
+        output_tokens = RateLimiter.estimate_tokens(content)
+        self.rate_limiter.consume(output_tokens)
+        self.latency.record(time.perf_counter() - started, output_tokens)
+        
+        if cache_key:
+            self.cache.set(cache_key, content)
+        
+        return content
+    
+    def _get_async_semaphore(self) -> asyncio.Semaphore:
+        """Concurrency cap for the running event loop (semaphores are loop-bound)"""
+        loop = asyncio.get_running_loop()
+        semaphore = self._async_semaphores.get(loop)
+        
+        if semaphore is None:
+            semaphore = asyncio.Semaphore(Config.ASYNC_CONCURRENCY)
+            self._async_semaphores[loop] = semaphore
+        
+        return semaphore
+    
+    def get_model_name(self) -> str:
+        """Get the model name for the active provider and mode"""
         if self.provider == "groq":
-            model = Config.GROQ_MODELS.get(self.mode, "unknown")
+            return Config.GROQ_MODELS.get(self.mode, Config.GROQ_MODELS["balanced"])
         elif self.provider == "gemini":
-            model = Config.GEMINI_MODELS.get(self.mode, "unknown")
-        
+            return Config.GEMINI_MODELS.get(self.mode, Config.GEMINI_MODELS["balanced"])
+        return "unknown"
+    
+    def get_cache_stats(self) -> Dict[str, float]:
+        """Get response cache statistics"""
+        if not self.cache:
+            return {"hits": 0, "misses": 0, "hit_rate": 0.0, "entries": 0}
+        return self.cache.get_stats()
+    
+    def get_rate_limit_stats(self) -> Dict[str, float]:
+        """Get queue wait statistics for this provider/model"""
+        stats = self.rate_limiter.get_stats()
+        stats["last_wait"] = round(self.last_queue_wait, 3)
+        return stats
+    
+    def get_info(self) -> Dict:
+        """Get provider information"""
         return {
             "provider": self.provider,
             "mode": self.mode,
-            "model": model
+            "model": self.get_model_name(),
+            "context_window": self.capabilities["context_window"],
+            "max_output_tokens": self.capabilities["max_output_tokens"]
         }
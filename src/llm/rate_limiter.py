@@ -0,0 +1,193 @@
+"""
+Token-bucket rate limiting for LLM providers
+One limiter per provider/model, shared by every LLMProvider in the process
+"""
+
+import asyncio
+import json
+import threading
+import time
+from pathlib import Path
+from typing import Dict, Optional
+from src.config import Config
+
+try:
+    import fcntl
+except ImportError:  # Windows: cross-process coordination unavailable
+    fcntl = None
+
+class TokenBucket:
+    """Token bucket that lets callers reserve capacity ahead of time"""
+
+    def __init__(self, capacity: float, refill_per_second: float):
+        self.capacity = capacity
+        self.refill_per_second = refill_per_second
+        self.tokens = capacity
+        self.updated = time.time()
+
+    def _refill(self, now: float):
+        elapsed = max(0.0, now - self.updated)
+        self.tokens = min(self.capacity, self.tokens + elapsed * self.refill_per_second)
+        self.updated = now
+
+    def reserve(self, amount: float, now: float) -> float:
+        """
+        Take `amount` from the bucket and return seconds to wait before using it
+
+        The balance may go negative, which queues later callers behind this one
+        instead of letting them race for the next refill.
+        """
+        self._refill(now)
+        self.tokens -= min(amount, self.capacity)
+
+        if self.tokens >= 0:
+            return 0.0
+        return -self.tokens / self.refill_per_second
+
+    def to_state(self) -> Dict[str, float]:
+        return {"tokens": self.tokens, "updated": self.updated}
+
+    def load_state(self, state: Dict[str, float]):
+        self.tokens = state.get("tokens", self.capacity)
+        self.updated = state.get("updated", self.updated)
+
+class RateLimiter:
+    """Request and token limits for a single provider/model"""
+
+    _registry: Dict[str, "RateLimiter"] = {}
+    _registry_lock = threading.Lock()
+
+    def __init__(self,
+                 name: str,
+                 requests_per_minute: float,
+                 tokens_per_minute: float,
+                 lock_dir: Optional[str] = None):
+        """
+        Initialize rate limiter
+
+        Args:
+            name: Identifier, e.g. "groq:llama-3.1-8b-instant"
+            requests_per_minute: Request budget
+            tokens_per_minute: Token budget (prompt + completion)
+            lock_dir: Directory for a shared state file to coordinate processes
+        """
+        self.name = name
+        self.requests = TokenBucket(requests_per_minute, requests_per_minute / 60.0)
+        self.tokens = TokenBucket(tokens_per_minute, tokens_per_minute / 60.0)
+        self._lock = threading.Lock()
+
+        self.state_path = None
+        if lock_dir and fcntl:
+            safe_name = name.replace(":", "_").replace("/", "_")
+            self.state_path = Path(lock_dir) / f"{safe_name}.ratelimit"
+            self.state_path.parent.mkdir(parents=True, exist_ok=True)
+
+        self.total_requests = 0
+        self.total_wait = 0.0
+        self.max_wait = 0.0
+
+    @classmethod
+    def for_model(cls, provider: str, model: str) -> "RateLimiter":
+        """Get the shared limiter for a provider/model, creating it on first use"""
+        key = f"{provider}:{model}"
+
+        with cls._registry_lock:
+            if key not in cls._registry:
+                limits = dict(Config.RATE_LIMITS.get(provider, {}))
+                limits.update(Config.MODEL_RATE_LIMITS.get(model, {}))
+                cls._registry[key] = cls(
+                    key,
+                    requests_per_minute=limits.get("requests_per_minute", 30),
+                    tokens_per_minute=limits.get("tokens_per_minute", 6000),
+                    lock_dir=Config.RATE_LIMIT_LOCK_DIR or None
+                )
+            return cls._registry[key]
+
+    def _reserve(self, requests: float, tokens: float) -> float:
+        """Reserve capacity in both buckets and return the required wait"""
+        with self._lock:
+            if not self.state_path:
+                now = time.time()
+                return max(self.requests.reserve(requests, now),
+                           self.tokens.reserve(tokens, now))
+
+            # Cross-process: bucket state lives in a file guarded by flock
+            with open(self.state_path, "a+") as f:
+                fcntl.flock(f, fcntl.LOCK_EX)
+                try:
+                    f.seek(0)
+                    raw = f.read()
+                    if raw:
+                        try:
+                            state = json.loads(raw)
+                            self.requests.load_state(state.get("requests", {}))
+                            self.tokens.load_state(state.get("tokens", {}))
+                        except ValueError:
+                            pass
+
+                    now = time.time()
+                    wait = max(self.requests.reserve(requests, now),
+                               self.tokens.reserve(tokens, now))
+
+                    f.seek(0)
+                    f.truncate()
+                    f.write(json.dumps({
+                        "requests": self.requests.to_state(),
+                        "tokens": self.tokens.to_state()
+                    }))
+                    f.flush()
+                finally:
+                    fcntl.flock(f, fcntl.LOCK_UN)
+
+            return wait
+
+    def acquire(self, tokens: int = 0) -> float:
+        """
+        Block until one request with `tokens` tokens is allowed
+
+        Returns:
+            Seconds spent waiting in the queue
+        """
+        wait = self._reserve(1, tokens)
+
+        if wait > 0:
+            time.sleep(wait)
+
+        self._record_wait(wait)
+        return wait
+
+    async def aacquire(self, tokens: int = 0) -> float:
+        """Async counterpart of acquire() that sleeps without blocking the event loop"""
+        wait = self._reserve(1, tokens)
+
+        if wait > 0:
+            await asyncio.sleep(wait)
+
+        self._record_wait(wait)
+        return wait
+
+    def _record_wait(self, wait: float):
+        with self._lock:
+            self.total_requests += 1
+            self.total_wait += wait
+            self.max_wait = max(self.max_wait, wait)
+
+    def consume(self, tokens: int):
+        """Charge tokens after the fact (e.g. completion tokens) without waiting"""
+        if tokens > 0:
+            self._reserve(0, tokens)
+
+    def get_stats(self) -> Dict[str, float]:
+        """Get queueing statistics"""
+        with self._lock:
+            return {
+                "requests": self.total_requests,
+                "total_wait": round(self.total_wait, 3),
+                "max_wait": round(self.max_wait, 3),
+                "avg_wait": round(self.total_wait / self.total_requests, 3) if self.total_requests else 0.0
+            }
+
+    @staticmethod
+    def estimate_tokens(text: str) -> int:
+        """Cheap token estimate (~4 characters per token) for budgeting"""
+        return len(text) // 4 + 1
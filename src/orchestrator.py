@@ -3,25 +3,35 @@ Content processing orchestrator
 Coordinates extraction, processing, and summarization
 """
 
-from typing import Dict, Optional
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor, wait
+from typing import Dict, List, Optional, Iterator, Tuple, Union
+from src.config import Config
 from src.extractors.youtube_extractor import YouTubeExtractor
 from src.extractors.website_extractor import WebsiteExtractor
 from src.processors.text_processor import TextProcessor
 from src.engines.summarization import SummarizationEngine
 from src.llm.provider import LLMProvider
+from src.utils.http_client import HTTPClient
 from src.utils.url_validator import URLValidator
 
 class ContentOrchestrator:
     """Orchestrates the entire content processing pipeline"""
     
-    def __init__(self, processing_mode: str = "balanced"):
+    # Canonical URL -> (fetched_at, result), shared by all orchestrators
+    _extraction_cache = OrderedDict()
+    _extraction_lock = threading.Lock()
+    
+    def __init__(self, processing_mode: str = "balanced", provider: str = "auto"):
         self.processing_mode = processing_mode
         self.youtube_extractor = YouTubeExtractor()
         self.website_extractor = WebsiteExtractor()
-        self.text_processor = TextProcessor()
+        self.text_processor = TextProcessor.get_shared()
         
         # Initialize LLM
-        self.llm_provider = LLMProvider(provider="auto", mode=processing_mode.lower())
+        self.llm_provider = LLMProvider(provider=provider, mode=processing_mode.lower())
         self.summarization_engine = SummarizationEngine(self.llm_provider)
     
     def process_url(self, url: str) -> Dict:
@@ -45,14 +55,50 @@ class ContentOrchestrator:
                 'error': error
             }
         
+        # Reuse recent extraction of the same page
+        canonical_url = URLValidator.canonicalize_url(url)
+        cached = self._get_cached_extraction(canonical_url)
+        if cached:
+            return cached
+        
         # Detect source type
         source_type = URLValidator.detect_source_type(url)
         
         # Extract content
         if source_type == 'youtube':
-            return self._process_youtube(url)
+            result = self._process_youtube(url)
         else:
-            return self._process_website(url)
+            result = self._process_website(url)
+        
+        if result['success']:
+            self._store_extraction(canonical_url, result)
+        
+        return result
+    
+    @classmethod
+    def _get_cached_extraction(cls, canonical_url: str) -> Optional[Dict]:
+        """Return a fresh cached extraction result, if any"""
+        with cls._extraction_lock:
+            entry = cls._extraction_cache.get(canonical_url)
+            if not entry:
+                return None
+            
+            fetched_at, result = entry
+            if time.time() - fetched_at > Config.EXTRACTION_CACHE_TTL:
+                del cls._extraction_cache[canonical_url]
+                return None
+            
+            cls._extraction_cache.move_to_end(canonical_url)
+            return dict(result)
+    
+    @classmethod
+    def _store_extraction(cls, canonical_url: str, result: Dict):
+        """Cache a successful extraction, evicting the least recently used"""
+        with cls._extraction_lock:
+            cls._extraction_cache[canonical_url] = (time.time(), dict(result))
+            cls._extraction_cache.move_to_end(canonical_url)
+            while len(cls._extraction_cache) > Config.EXTRACTION_CACHE_MAX_ENTRIES:
+                cls._extraction_cache.popitem(last=False)
     
     def _process_youtube(self, url: str) -> Dict:
         """Process YouTube video"""
@@ -119,18 +165,93 @@ class ContentOrchestrator:
                         content: str, 
                         depth: str,
                         style: str,
-                        source_type: str = 'website') -> str:
-        """Generate summary"""
+                        source_type: str = 'website',
+                        stream: bool = False,
+                        token_count: Optional[int] = None,
+                        use_cache: bool = True) -> Union[str, Iterator[str]]:
+        """
+        Generate summary, or an iterator of text fragments if stream=True
+        
+        Pass token_count from the extraction metadata to skip re-tokenizing,
+        and use_cache=False to get a fresh final call (e.g. on Regenerate).
+        """
+        if stream:
+            return self.summarization_engine.summarize_stream(
+                content=content,
+                depth=depth,
+                style=style,
+                source_type=source_type,
+                token_count=token_count,
+                use_cache=use_cache
+            )
+        
         return self.summarization_engine.summarize(
             content=content,
             depth=depth,
             style=style,
-            source_type=source_type
+            source_type=source_type,
+            token_count=token_count,
+            use_cache=use_cache
+        )
+    
+    async def agenerate_summary(self, 
+                               content: str, 
+                               depth: str,
+                               style: str,
+                               source_type: str = 'website',
+                               token_count: Optional[int] = None) -> str:
+        """Generate summary without blocking the event loop"""
+        return await self.summarization_engine.asummarize(
+            content=content,
+            depth=depth,
+            style=style,
+            source_type=source_type,
+            token_count=token_count
+        )
+    
+    def generate_section_summaries(self, sections: List[Dict]) -> Iterator[Dict]:
+        """Summaries of timestamped video sections, yielded as each one finishes"""
+        return self.summarization_engine.summarize_sections(sections)
+    
+    def synthesize_sections(self, 
+                            section_summaries: List[Dict], 
+                            depth: str,
+                            style: str,
+                            stream: bool = False,
+                            use_cache: bool = True) -> Union[str, Iterator[str]]:
+        """Overall summary from section summaries, or an iterator of fragments if stream=True"""
+        return self.summarization_engine.synthesize_sections(
+            section_summaries=section_summaries,
+            depth=depth,
+            style=style,
+            stream=stream,
+            use_cache=use_cache
+        )
+    
+    def generate_bundle(self, 
+                        content: str, 
+                        depth: str,
+                        style: str,
+                        question_type: str = "study",
+                        format_type: Optional[str] = None,
+                        token_count: Optional[int] = None) -> Dict[str, str]:
+        """Generate summary, insights and questions (and optional transform) in one call"""
+        return self.summarization_engine.generate_bundle(
+            content=content,
+            depth=depth,
+            style=style,
+            question_type=question_type,
+            format_type=format_type,
+            token_count=token_count
         )
     
-    def generate_insights(self, content: str) -> str:
+    def can_bundle(self, depth: str) -> bool:
+        """Whether bundle mode fits one call to this mode's model at this depth"""
+        return self.summarization_engine.bundle_fits(depth)
+    
+    def generate_insights(self, content: str, use_cache: bool = True) -> str:
         """Generate insights"""
-        return self.summarization_engine.extract_insights(content)
+        return self.summarization_engine.extract_insights(content, use_cache=use_cache)
     
     def generate_questions(self, content: str, question_type: str = "study") -> str:
         """Generate questions"""
@@ -140,12 +261,57 @@ class ContentOrchestrator:
         """Transform content"""
         return self.summarization_engine.transform_content(content, format_type)
     
-    def compare_urls(self, urls: list) -> str:
-        """Compare multiple URLs"""
-        sources = []
+    def compare_urls(self, urls: list, deadline: Optional[float] = None) -> Dict:
+        """
+        Compare multiple URLs, fetching them concurrently
+        
+        Sources not extracted within `deadline` seconds (default
+        Config.COMPARISON_FETCH_DEADLINE) are reported and left out; the
+        rest are still compared. Late fetches finish in the background and
+        land in the extraction cache.
+        
+        Returns: {
+            'comparison': Optional[str],
+            'sources': [{'url', 'success', 'title', 'elapsed', 'error'}],
+            'error': Optional[str]
+        }
+        """
+        deadline = Config.COMPARISON_FETCH_DEADLINE if deadline is None else deadline
+        
+        def fetch(url: str) -> Tuple[Dict, float]:
+            started = time.perf_counter()
+            try:
+                result = self.process_url(url)
+            except Exception as e:
+                result = {'success': False, 'error': f"Error processing URL: {str(e)}"}
+            return result, time.perf_counter() - started
         
-        for url in urls:
-            result = self.process_url(url)
+        executor = ThreadPoolExecutor(max_workers=max(1, len(urls)))
+        futures = [executor.submit(fetch, url) for url in urls]
+        wait(futures, timeout=deadline)
+        executor.shutdown(wait=False)
+        
+        report = []
+        sources = []
+        for url, future in zip(urls, futures):
+            if not future.done():
+                report.append({
+                    'url': url,
+                    'success': False,
+                    'title': None,
+                    'elapsed': deadline,
+                    'error': f"Timed out after {deadline:g}s"
+                })
+                continue
+            
+            result, elapsed = future.result()
+            report.append({
+                'url': url,
+                'success': result['success'],
+                'title': result.get('title'),
+                'elapsed': round(elapsed, 2),
+                'error': result.get('error')
+            })
             if result['success']:
                 sources.append({
                     'url': url,
@@ -153,9 +319,25 @@ class ContentOrchestrator:
                 })
         
         if not sources:
-            return "No valid sources to compare"
+            return {
+                'comparison': None,
+                'sources': report,
+                'error': "No valid sources to compare"
+            }
         
-        return self.summarization_engine.compare_sources(sources)
+        return {
+            'comparison': self.summarization_engine.compare_sources(sources),
+            'sources': report,
+            'error': None
+        }
+    
+    def get_http_stats(self) -> Dict:
+        """Get connection reuse statistics for website fetches"""
+        return HTTPClient.get_shared().get_stats()
+    
+    def get_dedup_stats(self) -> Dict:
+        """Get map calls saved by near-duplicate chunk detection"""
+        return self.summarization_engine.get_dedup_stats()
     
     def get_llm_info(self) -> Dict:
         """Get LLM provider info"""
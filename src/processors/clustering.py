@@ -0,0 +1,77 @@
+"""
+Chunk clustering for budgeted summarization
+Groups similar chunks so one representative per group can stand in for it
+"""
+
+import zlib
+import numpy as np
+from typing import List, Dict
+from src.processors.compressor import WORD_PATTERN, STOPWORDS
+
+# Width of the hashed TF-IDF vectors
+HASH_DIMENSIONS = 4096
+
+def hashed_tfidf(texts: List[str], dimensions: int = HASH_DIMENSIONS) -> np.ndarray:
+    """L2-normalized TF-IDF rows over hashed words (crc32, stable across processes)"""
+    counts = np.zeros((len(texts), dimensions))
+    for row, text in enumerate(texts):
+        for word in WORD_PATTERN.findall(text.lower()):
+            if word not in STOPWORDS:
+                counts[row, zlib.crc32(word.encode("utf-8")) % dimensions] += 1
+
+    document_frequency = np.count_nonzero(counts, axis=0)
+    idf = np.log((1 + len(texts)) / (1 + document_frequency)) + 1
+    vectors = np.log1p(counts) * idf
+
+    norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+    return vectors / np.where(norms > 0, norms, 1.0)
+
+def select_representatives(texts: List[str], k: int, iterations: int = 10) -> List[Dict]:
+    """
+    Cluster texts into at most k groups and pick the most central member of each
+
+    Farthest-point sampling seeds the centers, starting from the text closest
+    to the overall mean, so distinct topics are covered before refinement by
+    spherical k-means.
+
+    Returns: [{'index': int, 'members': List[int]}] ordered by index
+    """
+    n = len(texts)
+    if k >= n:
+        return [{'index': i, 'members': [i]} for i in range(n)]
+
+    vectors = hashed_tfidf(texts)
+
+    # Farthest-point seeding on cosine distance
+    centers = [int(np.argmax(vectors @ vectors.mean(axis=0)))]
+    closest = vectors @ vectors[centers[0]]
+    while len(centers) < k:
+        candidate = int(np.argmin(closest))
+        if candidate in centers:
+            break
+        centers.append(candidate)
+        closest = np.maximum(closest, vectors @ vectors[candidate])
+    centroids = vectors[centers]
+
+    for _ in range(iterations):
+        assignment = np.argmax(vectors @ centroids.T, axis=1)
+        updated = np.zeros_like(centroids)
+        np.add.at(updated, assignment, vectors)
+        norms = np.linalg.norm(updated, axis=1, keepdims=True)
+        # Clusters that lost every member keep their previous center
+        updated = np.where(norms > 0, updated / np.where(norms > 0, norms, 1.0), centroids)
+        if np.allclose(updated, centroids):
+            break
+        centroids = updated
+
+    similarity = vectors @ centroids.T
+    assignment = np.argmax(similarity, axis=1)
+
+    clusters = []
+    for cluster in range(len(centroids)):
+        members = np.flatnonzero(assignment == cluster)
+        if len(members):
+            representative = members[np.argmax(similarity[members, cluster])]
+            clusters.append({'index': int(representative), 'members': members.tolist()})
+
+    return sorted(clusters, key=lambda cluster: cluster['index'])
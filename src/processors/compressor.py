@@ -0,0 +1,131 @@
+"""
+Extractive pre-compression
+Ranks sentences by TextRank over TF-IDF vectors and keeps the most central
+ones within a token budget, so long content can be sent in fewer LLM calls
+"""
+
+import re
+import numpy as np
+from typing import List
+
+# Sentence ends, or line breaks in transcripts and lists
+SENTENCE_BOUNDARY = re.compile(r'(?<=[.!?])\s+|\n+')
+
+WORD_PATTERN = re.compile(r"[a-z0-9][a-z0-9']+")
+
+# Unpunctuated text (auto-generated captions) is split into windows of this many words
+MAX_SENTENCE_WORDS = 40
+
+STOPWORDS = frozenset("""
+a about above after again against all am an and any are as at be because been
+before being below between both but by can could did do does doing down during
+each few for from further had has have having he her here hers herself him
+himself his how i if in into is it its itself just me more most my myself no
+nor not now of off on once only or other our ours ourselves out over own same
+she should so some such than that the their theirs them themselves then there
+these they this those through to too under until up very was we were what when
+where which while who whom why will with would you your yours yourself
+yourselves also like really going get got know think right yeah okay um uh
+""".split())
+
+def split_sentences(text: str) -> List[str]:
+    """Split into sentences, breaking overlong unpunctuated runs into word windows"""
+    sentences = []
+    for sentence in SENTENCE_BOUNDARY.split(text):
+        words = sentence.split()
+        for start in range(0, len(words), MAX_SENTENCE_WORDS):
+            sentences.append(" ".join(words[start:start + MAX_SENTENCE_WORDS]))
+    return sentences
+
+def rank_sentences(sentences: List[str], damping: float = 0.85, iterations: int = 50) -> np.ndarray:
+    """
+    TextRank centrality of each sentence
+
+    Sentences are L2-normalized TF-IDF rows of a sparse (COO) matrix X, and
+    the similarity graph is S = X X^T without self-loops. S is never built:
+    each power iteration applies it as two sparse products X (X^T v), so
+    cost grows with the number of words rather than sentences squared.
+    """
+    n = len(sentences)
+    if n == 0:
+        return np.zeros(0)
+
+    vocabulary = {}
+    rows, cols, counts = [], [], []
+    for row, sentence in enumerate(sentences):
+        terms = {}
+        for word in WORD_PATTERN.findall(sentence.lower()):
+            if word not in STOPWORDS:
+                column = vocabulary.setdefault(word, len(vocabulary))
+                terms[column] = terms.get(column, 0) + 1
+        rows.extend([row] * len(terms))
+        cols.extend(terms.keys())
+        counts.extend(terms.values())
+
+    if not vocabulary:
+        return np.full(n, 1.0 / n)
+
+    rows = np.asarray(rows, dtype=np.int64)
+    cols = np.asarray(cols, dtype=np.int64)
+    document_frequency = np.bincount(cols, minlength=len(vocabulary))
+    idf = np.log((1 + n) / (1 + document_frequency)) + 1
+    values = (1 + np.log(np.asarray(counts, dtype=np.float64))) * idf[cols]
+
+    norms = np.sqrt(np.bincount(rows, weights=values ** 2, minlength=n))
+    values /= norms[rows]
+
+    def similarity(vector: np.ndarray) -> np.ndarray:
+        """(X X^T - I) v for unit rows; empty rows have no edges"""
+        projected = np.bincount(cols, weights=values * vector[rows], minlength=len(vocabulary))
+        result = np.bincount(rows, weights=values * projected[cols], minlength=n)
+        return result - vector * (norms > 0)
+
+    degree = similarity(np.ones(n))
+    connected = degree > 1e-12
+    if not connected.any():
+        return np.full(n, 1.0 / n)
+
+    scores = np.full(n, 1.0 / n)
+    for _ in range(iterations):
+        outgoing = np.where(connected, scores / np.where(connected, degree, 1.0), 0.0)
+        # Rank held by sentences with no edges is spread evenly
+        dangling = scores[~connected].sum() / n
+        updated = (1 - damping) / n + damping * (similarity(outgoing) + dangling)
+        if np.abs(updated - scores).sum() < 1e-6:
+            return updated
+        scores = updated
+
+    return scores
+
+class ExtractiveCompressor:
+    """Shrink text to a token budget by keeping its most central sentences"""
+
+    def __init__(self, processor):
+        """
+        Args:
+            processor: TextProcessor whose encoding measures the budget
+        """
+        self.processor = processor
+
+    def compress(self, text: str, target_tokens: int) -> str:
+        """
+        Keep the highest-ranked sentences that fit target_tokens, in original order
+
+        Text already within budget is returned unchanged.
+        """
+        if self.processor.count_tokens(text) <= target_tokens:
+            return text
+
+        sentences = split_sentences(text)
+        scores = rank_sentences(sentences)
+        lengths = [len(tokens) for tokens in self.processor.encoding.encode_ordinary_batch(sentences)]
+
+        selected = []
+        used = 0
+        for index in np.argsort(-scores, kind="stable"):
+            # +1 for the joining space
+            if used + lengths[index] + 1 <= target_tokens:
+                selected.append(index)
+                used += lengths[index] + 1
+
+        return " ".join(sentences[index] for index in sorted(selected))
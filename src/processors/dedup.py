@@ -0,0 +1,67 @@
+"""
+Near-duplicate chunk detection
+MinHash signatures over word shingles, so repeated passages are summarized once
+"""
+
+import zlib
+import numpy as np
+from typing import List, Dict, Optional
+from src.config import Config
+
+# Words per shingle
+SHINGLE_SIZE = 5
+
+# Signature length; similarity estimates have standard error ~ 1/sqrt(NUM_HASHES)
+NUM_HASHES = 128
+
+# Universal hashing h(x) = (a*x + b) mod p; p < 2^31 keeps a*x within int64
+_PRIME = (1 << 31) - 1
+_rng = np.random.default_rng(20240601)
+_A = _rng.integers(1, _PRIME, size=NUM_HASHES, dtype=np.int64)
+_B = _rng.integers(0, _PRIME, size=NUM_HASHES, dtype=np.int64)
+
+def minhash_signature(text: str) -> np.ndarray:
+    """MinHash signature of the text's word shingles"""
+    words = text.lower().split()
+    if len(words) <= SHINGLE_SIZE:
+        shingles = [" ".join(words)]
+    else:
+        shingles = [" ".join(words[i:i + SHINGLE_SIZE]) for i in range(len(words) - SHINGLE_SIZE + 1)]
+
+    hashes = np.fromiter(
+        (zlib.crc32(shingle.encode("utf-8")) for shingle in set(shingles)),
+        dtype=np.int64
+    ) % _PRIME
+    return ((np.outer(hashes, _A) + _B) % _PRIME).min(axis=0)
+
+def find_near_duplicates(chunks: List[Dict], threshold: Optional[float] = None) -> List[int]:
+    """
+    Map every chunk to the first earlier chunk it nearly duplicates
+
+    The leading `overlap_chars` of each chunk (text repeated from the
+    previous chunk by chunk_text) are left out, so neighbours are not
+    matched on their shared overlap.
+
+    Returns: list where entry i is i for unique chunks, or the index of the
+    chunk whose summary can stand in for chunk i
+    """
+    threshold = Config.DEDUP_THRESHOLD if threshold is None else threshold
+    canonical = list(range(len(chunks)))
+    if len(chunks) < 2:
+        return canonical
+
+    signatures = np.stack([
+        minhash_signature(chunk['text'][chunk.get('overlap_chars', 0):]) for chunk in chunks
+    ])
+
+    unique = []
+    for index, signature in enumerate(signatures):
+        if unique:
+            similarity = (signatures[unique] == signature).mean(axis=1)
+            best = int(np.argmax(similarity))
+            if similarity[best] >= threshold:
+                canonical[index] = unique[best]
+                continue
+        unique.append(index)
+
+    return canonical
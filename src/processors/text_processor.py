@@ -2,21 +2,162 @@
 Text preprocessing and intelligent chunking
 """
 
-import tiktoken
-from typing import List, Dict
+import bisect
+import hashlib
+import itertools
+import threading
+from array import array
+from collections import OrderedDict
+from typing import List, Dict, Optional, Tuple
 import re
+import numpy as np
+from src.config import Config
+from src.processors.compressor import split_sentences, rank_sentences
+from src.processors.tokenizer import get_encoding
+
+class TokenMemo:
+    """
+    Content-hash keyed memo of encodings and token counts
+    
+    Encodings are stored as compact uint32 arrays and evicted LRU once the
+    total stored tokens exceed max_tokens; counts are kept for up to
+    max_counts texts, so a count survives its encoding being evicted.
+    """
+    
+    def __init__(self, max_tokens: int, max_counts: int):
+        self.max_tokens = max_tokens
+        self.max_counts = max_counts
+        self._encodings = OrderedDict()
+        self._counts = OrderedDict()
+        self._stored_tokens = 0
+        self._lock = threading.Lock()
+    
+    @staticmethod
+    def make_key(encoding_name: str, text: str) -> Tuple[str, str]:
+        return encoding_name, hashlib.sha1(text.encode('utf-8', errors='surrogatepass')).hexdigest()
+    
+    def get_encoding(self, key: Tuple[str, str]) -> Optional[array]:
+        with self._lock:
+            tokens = self._encodings.get(key)
+            if tokens is not None:
+                self._encodings.move_to_end(key)
+            return tokens
+    
+    def get_count(self, key: Tuple[str, str]) -> Optional[int]:
+        with self._lock:
+            count = self._counts.get(key)
+            if count is not None:
+                self._counts.move_to_end(key)
+            return count
+    
+    def put(self, key: Tuple[str, str], tokens: List[int]):
+        with self._lock:
+            self._counts[key] = len(tokens)
+            self._counts.move_to_end(key)
+            while len(self._counts) > self.max_counts:
+                self._counts.popitem(last=False)
+            
+            if len(tokens) > self.max_tokens or key in self._encodings:
+                return
+            
+            self._encodings[key] = array('I', tokens)
+            self._stored_tokens += len(tokens)
+            while self._stored_tokens > self.max_tokens:
+                _, evicted = self._encodings.popitem(last=False)
+                self._stored_tokens -= len(evicted)
+    
+    def clear(self):
+        with self._lock:
+            self._encodings.clear()
+            self._counts.clear()
+            self._stored_tokens = 0
 
 class TextProcessor:
     """Process and chunk text for LLM consumption"""
     
-    def __init__(self, max_chunk_size: int = 8000, overlap: int = 500):
+    # Encoding name -> byte length per token id, shared by all instances
+    _token_byte_lengths: Dict[str, List[int]] = {}
+    
+    # Encodings and counts shared by all instances
+    _memo = TokenMemo(Config.TOKEN_MEMO_MAX_TOKENS, Config.TOKEN_MEMO_MAX_COUNTS)
+    
+    # (settings, content hash) -> chunks, least recently used first
+    _chunk_memo = OrderedDict()
+    _chunk_memo_lock = threading.Lock()
+    
+    # (max_chunk_size, overlap, packing) -> shared instance
+    _shared: Dict[Tuple[int, int, str], "TextProcessor"] = {}
+    _shared_lock = threading.Lock()
+    
+    # Optimal packing considers one boundary (a section if there is one) and
+    # hard cuts at most once per max_chunk_size / PACKING_RESOLUTION tokens,
+    # bounding the search
+    PACKING_RESOLUTION = 64
+    
+    def __init__(self, max_chunk_size: int = 8000, overlap: int = 500, packing: str = Config.CHUNK_PACKING):
         self.max_chunk_size = max_chunk_size
         self.overlap = overlap
-        self.encoding = tiktoken.get_encoding("cl100k_base")
+        self.packing = packing
+        self.encoding = get_encoding("cl100k_base")
+    
+    @classmethod
+    def get_shared(cls, 
+                   max_chunk_size: int = Config.MAX_CHUNK_SIZE, 
+                   overlap: int = Config.CHUNK_OVERLAP,
+                   packing: str = Config.CHUNK_PACKING) -> "TextProcessor":
+        """Get the process-wide processor for these settings, creating it on first use"""
+        key = (max_chunk_size, overlap, packing)
+        
+        with cls._shared_lock:
+            if key not in cls._shared:
+                cls._shared[key] = cls(max_chunk_size, overlap, packing)
+            return cls._shared[key]
+    
+    @classmethod
+    def for_model(cls, 
+                  model: str, 
+                  token_limit: Optional[int] = None, 
+                  reserved_tokens: int = 0) -> "TextProcessor":
+        """
+        Shared processor whose chunks fill one call to the model
+        
+        Args:
+            model: Model name in Config.MODEL_CAPABILITIES
+            token_limit: Smaller per-request limit than the context window, if any
+            reserved_tokens: Room left in each call for the prompt and the output
+        """
+        usable = Config.get_model_capabilities(model)["context_window"]
+        if token_limit:
+            usable = min(usable, token_limit)
+        
+        chunk_size = min(Config.MAX_CHUNK_SIZE, usable - reserved_tokens)
+        return cls.get_shared(max(chunk_size, 2 * Config.CHUNK_OVERLAP), Config.CHUNK_OVERLAP)
+    
+    @classmethod
+    def clear_token_memo(cls):
+        """Drop all memoized encodings, counts and chunks"""
+        cls._memo.clear()
+        with cls._chunk_memo_lock:
+            cls._chunk_memo.clear()
     
     def count_tokens(self, text: str) -> int:
-        """Count tokens in text"""
-        return len(self.encoding.encode(text))
+        """Count tokens in text (memoized by content hash)"""
+        key = TokenMemo.make_key(self.encoding.name, text)
+        count = self._memo.get_count(key)
+        if count is None:
+            count = len(self._encode(text, key))
+        return count
+    
+    def encode(self, text: str) -> List[int]:
+        """Encode text to token ids (memoized by content hash)"""
+        return list(self._encode(text, TokenMemo.make_key(self.encoding.name, text)))
+    
+    def _encode(self, text: str, key: Tuple[str, str]):
+        tokens = self._memo.get_encoding(key)
+        if tokens is None:
+            tokens = self.encoding.encode(text)
+            self._memo.put(key, tokens)
+        return tokens
     
     def clean_text(self, text: str) -> str:
         """Clean and normalize text"""
@@ -73,85 +214,95 @@ class TextProcessor:
     def chunk_text(self, text: str) -> List[Dict[str, any]]:
         """
         Intelligently chunk text with overlap
-        Returns list of chunks with metadata
+        Returns list of chunks with metadata; 'overlap_chars' is the length
+        of the leading text repeated from the previous chunk
+        
+        The text is encoded once; chunk boundaries and overlaps are computed
+        on token positions and snapped to section/sentence boundaries through
+        a token -> byte offset map. With packing="optimal" all chunk ends are
+        chosen up front by _pack_chunk_ends; "greedy" picks each end in turn.
+        Results for the last Config.CHUNK_MEMO_MAX_ENTRIES texts are memoized
+        by content hash.
         """
+        key = (self.max_chunk_size, self.overlap, self.packing) + TokenMemo.make_key(self.encoding.name, text)
+        with self._chunk_memo_lock:
+            chunks = self._chunk_memo.get(key)
+            if chunks is not None:
+                self._chunk_memo.move_to_end(key)
+                return [dict(chunk) for chunk in chunks]
+        
+        chunks = self._chunk_text(text)
+        
+        with self._chunk_memo_lock:
+            self._chunk_memo[key] = chunks
+            while len(self._chunk_memo) > Config.CHUNK_MEMO_MAX_ENTRIES:
+                self._chunk_memo.popitem(last=False)
+        
+        return [dict(chunk) for chunk in chunks]
+    
+    def _chunk_text(self, text: str) -> List[Dict[str, any]]:
+        """Uncached chunk_text()"""
         text = self.clean_text(text)
+        tokens = self._encode(text, TokenMemo.make_key(self.encoding.name, text))
+        total_tokens = len(tokens)
         
         # If text is small enough, return as single chunk
-        token_count = self.count_tokens(text)
-        if token_count <= self.max_chunk_size:
+        if total_tokens <= self.max_chunk_size:
             return [{
                 'text': text,
                 'chunk_id': 0,
                 'total_chunks': 1,
-                'token_count': token_count
+                'token_count': total_tokens,
+                'overlap_chars': 0
             }]
         
-        # Split into sections first
-        sections = self.split_by_sections(text)
+        # Byte offset where each token starts (plus end of text), from the token table
+        data = text.encode('utf-8')
+        offsets = [0]
+        offsets.extend(itertools.accumulate(map(self._get_token_byte_lengths().__getitem__, tokens)))
+        
+        section_bounds = self._to_token_positions(self._section_boundaries(data), offsets)
+        sentence_bounds = self._to_token_positions(self._sentence_boundaries(data), offsets)
+        
+        packed_ends = None
+        if self.packing == "optimal":
+            packed_ends = self._pack_chunk_ends(total_tokens, section_bounds, sentence_bounds)
         
         chunks = []
-        current_chunk = ""
-        current_tokens = 0
-        chunk_id = 0
+        start = 0
+        previous_end = 0
         
-        for section in sections:
-            section_tokens = self.count_tokens(section)
+        while start < total_tokens:
+            limit = start + self.max_chunk_size
             
-            # If single section is too large, split it
-            if section_tokens > self.max_chunk_size:
-                # Split by sentences
-                sentences = re.split(r'(?<=[.!?])\s+', section)
-                
-                for sentence in sentences:
-                    sentence_tokens = self.count_tokens(sentence)
-                    
-                    if current_tokens + sentence_tokens > self.max_chunk_size:
-                        # Save current chunk
-                        if current_chunk:
-                            chunks.append({
-                                'text': current_chunk.strip(),
-                                'chunk_id': chunk_id,
-                                'token_count': current_tokens
-                            })
-                            chunk_id += 1
-                            
-                            # Start new chunk with overlap
-                            overlap_text = self._get_overlap(current_chunk)
-                            current_chunk = overlap_text + " " + sentence
-                            current_tokens = self.count_tokens(current_chunk)
-                        else:
-                            current_chunk = sentence
-                            current_tokens = sentence_tokens
-                    else:
-                        current_chunk += " " + sentence
-                        current_tokens += sentence_tokens
-            
-            # Section fits in current chunk
-            elif current_tokens + section_tokens <= self.max_chunk_size:
-                current_chunk += "\n\n" + section
-                current_tokens += section_tokens
-            
-            # Section doesn't fit, start new chunk
+            if packed_ends:
+                end = packed_ends[len(chunks)]
+            elif limit >= total_tokens:
+                end = total_tokens
             else:
-                if current_chunk:
-                    chunks.append({
-                        'text': current_chunk.strip(),
-                        'chunk_id': chunk_id,
-                        'token_count': current_tokens
-                    })
-                    chunk_id += 1
-                
-                current_chunk = section
-                current_tokens = section_tokens
-        
-        # Add final chunk
-        if current_chunk:
+                # Prefer a section break, then a sentence break, in the back half of the window
+                floor = start + self.max_chunk_size // 2
+                end = (
+                    self._last_boundary(section_bounds, floor, limit) or
+                    self._last_boundary(sentence_bounds, floor, limit) or
+                    limit
+                )
+            
+            chunk_bytes = data[offsets[start]:offsets[end]]
+            overlap_bytes = data[offsets[start]:offsets[max(start, previous_end)]]
             chunks.append({
-                'text': current_chunk.strip(),
-                'chunk_id': chunk_id,
-                'token_count': current_tokens
+                'text': chunk_bytes.decode('utf-8', errors='ignore').strip(),
+                'chunk_id': len(chunks),
+                'token_count': end - start,
+                'overlap_chars': len(overlap_bytes.decode('utf-8', errors='ignore').lstrip())
             })
+            
+            if end >= total_tokens:
+                break
+            previous_end = end
+            
+            # Start next chunk with overlap, snapped forward to a sentence start
+            start = self._overlap_start(max(start + 1, end - self.overlap), end, sentence_bounds)
         
         # Add total chunks to each
         total = len(chunks)
@@ -160,26 +311,155 @@ class TextProcessor:
         
         return chunks
     
-    def _get_overlap(self, text: str) -> str:
-        """Get last N tokens for overlap"""
-        tokens = self.encoding.encode(text)
-        overlap_tokens = tokens[-self.overlap:] if len(tokens) > self.overlap else tokens
-        return self.encoding.decode(overlap_tokens)
+    def _overlap_start(self, earliest: int, end: int, sentence_bounds: List[int]) -> int:
+        """First sentence start in [earliest, end), else earliest"""
+        idx = bisect.bisect_left(sentence_bounds, earliest)
+        if idx < len(sentence_bounds) and sentence_bounds[idx] < end:
+            return sentence_bounds[idx]
+        return earliest
+    
+    def _pack_chunk_ends(self, 
+                         total_tokens: int, 
+                         section_bounds: List[int], 
+                         sentence_bounds: List[int]) -> List[int]:
+        """
+        Chunk end positions for the fewest, most evenly filled chunks
+        
+        Dynamic programming over candidate cuts: the last section boundary, else
+        the last sentence boundary, of each window of max_chunk_size /
+        PACKING_RESOLUTION tokens, and hard cuts wherever neither is in reach.
+        A chunk starting after cut i also holds the overlap that chunk_text
+        will prepend. Cost, compared in order: hard cuts, chunks, sentence
+        cuts, sum of squared unused tokens. Hard cuts come first, so text is
+        cut mid-sentence only where no boundary is in reach, never to save
+        a chunk.
+        """
+        step = self.max_chunk_size - self.overlap
+        if step <= 0:
+            raise Exception("Chunk overlap must be smaller than the maximum chunk size")
+        
+        sections = set(section_bounds)
+        spacing = max(1, self.max_chunk_size // self.PACKING_RESOLUTION)
+        
+        # (position, penalty index): 0 = section, 1 = sentence, 2 = hard cut
+        windows = {}
+        for pos in sorted(sections.union(sentence_bounds)):
+            if 0 < pos < total_tokens:
+                kind = 0 if pos in sections else 1
+                window = pos // spacing
+                if window not in windows or kind <= windows[window][1]:
+                    windows[window] = (pos, kind)
+        candidates = [(0, 0)] + sorted(windows.values()) + [(total_tokens, 0)]
+        candidates = self._fill_gaps(candidates, range(spacing, total_tokens, spacing), spacing, 2)
+        positions = [pos for pos, _ in candidates]
+        
+        # The cost (hard, chunks, sentence, slack) packed into one integer: each
+        # weight exceeds the largest possible total of the terms after it
+        n = len(positions)
+        sentence_weight = n * self.max_chunk_size ** 2 + 1
+        chunk_weight = sentence_weight * (n + 1)
+        hard_weight = chunk_weight * (n + 1)
+        cut_costs = [chunk_weight + (0, sentence_weight, hard_weight)[kind] for _, kind in candidates]
+        cut_costs[-1] = chunk_weight
+        
+        # best[i]: cost of packing positions[i:], and the next cut
+        best = [None] * n
+        following = [None] * n
+        best[-1] = 0
+        
+        for i in range(n - 2, -1, -1):
+            overlap = positions[i] - self._overlap_start(positions[i] - self.overlap, positions[i], sentence_bounds)
+            reach = positions[i] + self.max_chunk_size - (overlap if i > 0 else 0)
+            last = bisect.bisect_right(positions, reach, i + 1) - 1
+            
+            for j in range(i + 1, last + 1):
+                if best[j] is None:
+                    continue
+                unused = reach - positions[j]
+                cost = best[j] + cut_costs[j] + unused * unused
+                if best[i] is None or cost < best[i]:
+                    best[i] = cost
+                    following[i] = j
+        
+        ends = []
+        i = 0
+        while following[i] is not None:
+            i = following[i]
+            ends.append(positions[i])
+        
+        return ends
+    
+    def _fill_gaps(self, candidates: List[Tuple[int, int]], fillers, gap: int, penalty: int) -> List[Tuple[int, int]]:
+        """Add filler positions between consecutive candidates more than `gap` apart"""
+        fillers = list(fillers)
+        result = [candidates[0]]
+        
+        for pos, kind in candidates[1:]:
+            previous = result[-1][0]
+            if pos - previous > gap:
+                for filler in fillers[bisect.bisect_right(fillers, previous):bisect.bisect_left(fillers, pos)]:
+                    result.append((filler, penalty))
+            result.append((pos, kind))
+        
+        return result
+    
+    def get_packing_stats(self, chunks: List[Dict]) -> Dict[str, float]:
+        """Chunk count and how full chunks are relative to max_chunk_size"""
+        fills = [chunk['token_count'] / self.max_chunk_size for chunk in chunks]
+        return {
+            'chunks': len(chunks),
+            'mean_fill': sum(fills) / len(fills) if fills else 0.0,
+            'min_fill': min(fills) if fills else 0.0
+        }
+    
+    def _get_token_byte_lengths(self) -> List[int]:
+        """Byte length of every token id, built once per encoding"""
+        lengths = TextProcessor._token_byte_lengths.get(self.encoding.name)
+        
+        if lengths is None:
+            lengths = []
+            for token in range(self.encoding.n_vocab):
+                try:
+                    lengths.append(len(self.encoding.decode_single_token_bytes(token)))
+                except KeyError:
+                    lengths.append(0)
+            TextProcessor._token_byte_lengths[self.encoding.name] = lengths
+        
+        return lengths
+    
+    def _section_boundaries(self, data: bytes) -> List[Tuple[int, int]]:
+        """Byte spans of the whitespace between sections (blank lines, or the newline after a heading)"""
+        return [m.span() for m in re.finditer(rb'\n\s*\n|(?<=:)\n', data)]
+    
+    def _sentence_boundaries(self, data: bytes) -> List[Tuple[int, int]]:
+        """Byte spans of the whitespace between sentences or lines"""
+        return [m.span() for m in re.finditer(rb'(?<=[.!?])\s+|\n', data)]
+    
+    def _to_token_positions(self, spans: List[Tuple[int, int]], offsets: List[int]) -> List[int]:
+        """
+        Map whitespace spans to token positions where the text can be cut
+        
+        A span maps to the first token starting within it. Tokenizers attach
+        leading whitespace to the next word (" Alpha"), so when the span lies
+        inside a token the cut goes before that token rather than after it,
+        which would carry the next sentence's first word into this chunk.
+        """
+        positions = set()
+        for start, end in spans:
+            idx = bisect.bisect_left(offsets, start)
+            positions.add(idx if offsets[idx] <= end else idx - 1)
+        
+        return sorted(positions)
+    
+    def _last_boundary(self, bounds: List[int], floor: int, limit: int) -> Optional[int]:
+        """Largest boundary in (floor, limit], or None"""
+        idx = bisect.bisect_right(bounds, limit) - 1
+        if idx >= 0 and bounds[idx] > floor:
+            return bounds[idx]
+        return None
     
     def extract_key_sentences(self, text: str, n: int = 5) -> List[str]:
-        """Extract potentially key sentences (simple heuristic)"""
-        sentences = re.split(r'(?<=[.!?])\s+', text)
-        
-        # Simple scoring: longer sentences, sentences with important keywords
-        scored = []
-        keywords = ['important', 'key', 'main', 'critical', 'essential', 'conclusion', 'summary']
-        
-        for sent in sentences:
-            score = len(sent)  # Length bonus
-            for kw in keywords:
-                if kw in sent.lower():
-                    score += 100
-            scored.append((score, sent))
-        
-        scored.sort(reverse=True)
-        return [sent for _, sent in scored[:n]]
+        """Extract the n most central sentences (TextRank), most central first"""
+        sentences = split_sentences(text)
+        scores = rank_sentences(sentences)
+        return [sentences[i] for i in np.argsort(-scores, kind="stable")[:n]]
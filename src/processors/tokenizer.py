@@ -0,0 +1,64 @@
+"""
+Shared tiktoken encodings
+Loaded lazily once per process, from a local BPE file when available so
+first use does not need network access
+"""
+
+import hashlib
+import os
+import shutil
+import threading
+import tiktoken
+from pathlib import Path
+from src.config import Config
+
+# Where tiktoken downloads each BPE file from (its cache is keyed by this URL)
+BPE_URLS = {
+    "cl100k_base": "https://openaipublic.blob.core.windows.net/encodings/cl100k_base.tiktoken"
+}
+
+_encodings = {}
+_lock = threading.Lock()
+
+def get_encoding(name: str = "cl100k_base") -> tiktoken.Encoding:
+    """Get the shared encoding, loading it on first use"""
+    encoding = _encodings.get(name)
+    if encoding is not None:
+        return encoding
+
+    with _lock:
+        if name not in _encodings:
+            _seed_cache(name)
+            try:
+                _encodings[name] = tiktoken.get_encoding(name)
+            except Exception as e:
+                raise Exception(
+                    f"Could not load tokenizer '{name}': {str(e)}. "
+                    f"For offline use, place {name}.tiktoken in {Config.TIKTOKEN_BPE_DIR}"
+                )
+        return _encodings[name]
+
+def _seed_cache(name: str):
+    """
+    Point tiktoken at our cache directory and copy a local BPE file into it
+
+    tiktoken looks up TIKTOKEN_CACHE_DIR/<sha1(url)> before downloading, so a
+    bundled file placed there is used without touching the network.
+    """
+    os.environ.setdefault("TIKTOKEN_CACHE_DIR", str(Config.TIKTOKEN_CACHE_DIR))
+
+    url = BPE_URLS.get(name)
+    local_file = Path(Config.TIKTOKEN_BPE_DIR) / f"{name}.tiktoken"
+    if not url or not local_file.exists():
+        return
+
+    cache_dir = Path(os.environ["TIKTOKEN_CACHE_DIR"])
+    cache_path = cache_dir / hashlib.sha1(url.encode()).hexdigest()
+    if cache_path.exists():
+        return
+
+    try:
+        cache_dir.mkdir(parents=True, exist_ok=True)
+        shutil.copyfile(local_file, cache_path)
+    except OSError as e:
+        print(f"Could not seed tokenizer cache from {local_file}: {e}")
@@ -3,11 +3,24 @@ Main page UI component
 """
 
 import streamlit as st
+from src.config import Config
 from src.ui.theme import render_header, render_info_box
 from src.orchestrator import ContentOrchestrator
 from src.utils.session import reset_content_state, add_processed_url
 from src.ui.export import render_export_section
 
+@st.cache_resource(show_spinner=False)
+def get_orchestrator(processing_mode: str, provider: str) -> ContentOrchestrator:
+    """Shared orchestrator (warm extractors and LLM client) per mode and provider"""
+    return ContentOrchestrator(processing_mode=processing_mode, provider=provider)
+
+def get_current_orchestrator() -> ContentOrchestrator:
+    """Orchestrator for the session's processing mode"""
+    return get_orchestrator(
+        st.session_state.processing_mode,
+        Config.get_available_provider() or "auto"
+    )
+
 def render_main_page():
     """Render main content area"""
     
@@ -20,6 +33,10 @@ def render_main_page():
     # Main Content Tabs (only show if content is processed)
     if st.session_state.current_content:
         render_content_tabs()
+    
+    # Comparison results (if any)
+    if st.session_state.comparison_result:
+        render_comparison_result()
 
 def render_input_section():
     """Render URL input and processing section"""
@@ -120,9 +137,7 @@ def process_single_url(url: str):
         status_text = st.empty()
         
         # Initialize orchestrator
-        orchestrator = ContentOrchestrator(
-            processing_mode=st.session_state.processing_mode
-        )
+        orchestrator = get_current_orchestrator()
         
         # Extract content
         status_text.text("📥 Extracting content...")
@@ -136,14 +151,31 @@ def process_single_url(url: str):
         
         progress_bar.progress(50)
         
-        # Generate summary
-        status_text.text("✨ Generating summary...")
-        summary = orchestrator.generate_summary(
-            content=result['content'],
-            depth=st.session_state.summary_depth,
-            style=st.session_state.summary_style,
-            source_type=result['source_type']
-        )
+        if st.session_state.bundle_mode:
+            # Summary, insights and questions from one call
+            status_text.text("✨ Generating summary, insights and questions...")
+            bundle = orchestrator.generate_bundle(
+                content=result['content'],
+                depth=st.session_state.summary_depth,
+                style=st.session_state.summary_style,
+                token_count=result['metadata']['token_count']
+            )
+            summary = bundle['summary']
+            st.session_state.current_insights = bundle['insights']
+            st.session_state.current_questions = bundle['questions']
+        elif use_section_mode(result):
+            summary = summarize_by_section(orchestrator, result, progress_bar, status_text)
+        else:
+            # Generate summary, rendering tokens as they arrive
+            status_text.text("✨ Generating summary...")
+            summary = st.write_stream(orchestrator.generate_summary(
+                content=result['content'],
+                depth=st.session_state.summary_depth,
+                style=st.session_state.summary_style,
+                source_type=result['source_type'],
+                stream=True,
+                token_count=result['metadata']['token_count']
+            ))
         
         progress_bar.progress(75)
         
@@ -158,6 +190,39 @@ def process_single_url(url: str):
         st.success("✅ Content processed successfully!")
         st.rerun()
 
+def use_section_mode(result: dict) -> bool:
+    """Whether to summarize a result section by section"""
+    return (
+        st.session_state.section_mode and
+        result['source_type'] == 'youtube' and
+        len(result['metadata'].get('sections', [])) > 1
+    )
+
+def summarize_by_section(orchestrator: ContentOrchestrator, result: dict, progress_bar, status_text) -> str:
+    """Show section summaries as they finish, then stream the overall summary"""
+    sections = result['metadata']['sections']
+    section_summaries = []
+    
+    status_text.text(f"⏱️ Summarizing {len(sections)} sections...")
+    st.markdown("#### ⏱️ Sections")
+    for section in orchestrator.generate_section_summaries(sections):
+        section_summaries.append(section)
+        st.markdown(f"**[{section['timestamp']}]** {section['summary']}")
+        progress_bar.progress(50 + 25 * len(section_summaries) // len(sections))
+    
+    st.session_state.current_section_summaries = sorted(
+        section_summaries, key=lambda section: section['index']
+    )
+    
+    status_text.text("✨ Synthesizing summary...")
+    st.markdown("#### 📝 Summary")
+    return st.write_stream(orchestrator.synthesize_sections(
+        section_summaries,
+        depth=st.session_state.summary_depth,
+        style=st.session_state.summary_style,
+        stream=True
+    ))
+
 def process_comparison():
     """Process multiple URLs for comparison"""
     
@@ -166,14 +231,16 @@ def process_comparison():
         return
     
     with st.spinner("🔄 Processing and comparing URLs..."):
-        orchestrator = ContentOrchestrator(
-            processing_mode=st.session_state.processing_mode
-        )
+        orchestrator = get_current_orchestrator()
         
         comparison = orchestrator.compare_urls(st.session_state.comparison_urls)
         st.session_state.comparison_result = comparison
         
-        st.success("✅ Comparison complete!")
+        failed = [source for source in comparison['sources'] if not source['success']]
+        if comparison['comparison'] and failed:
+            st.warning(f"⚠️ Compared {len(comparison['sources']) - len(failed)} sources; {len(failed)} could not be loaded")
+        elif comparison['comparison']:
+            st.success("✅ Comparison complete!")
         st.rerun()
 
 def render_content_tabs():
@@ -218,12 +285,26 @@ def render_content_tabs():
     
     with tab5:
         render_export_section()
+
+def render_comparison_result():
+    """Render comparison text and the per-source fetch report"""
+    result = st.session_state.comparison_result
     
-    # Comparison results (if any)
-    if st.session_state.comparison_result:
-        st.markdown("---")
-        st.markdown("### 🔄 Comparison Results")
-        st.markdown(st.session_state.comparison_result)
+    st.markdown("---")
+    st.markdown("### 🔄 Comparison Results")
+    
+    if result['comparison']:
+        st.markdown(result['comparison'])
+    else:
+        st.error(f"❌ {result['error']}")
+    
+    with st.expander("📡 Sources"):
+        for source in result['sources']:
+            status = "✅" if source['success'] else "❌"
+            line = f"{status} {source['title'] or source['url']} ({source['elapsed']:.1f}s)"
+            if source['error']:
+                line += f" - {source['error']}"
+            st.markdown(line)
 
 def render_summary_tab():
     """Render summary tab"""
@@ -232,6 +313,12 @@ def render_summary_tab():
         st.markdown("### 📝 Summary")
         st.markdown(st.session_state.current_summary)
         
+        # Timestamped section summaries from section mode
+        if st.session_state.current_section_summaries:
+            with st.expander("⏱️ Section Summaries"):
+                for section in st.session_state.current_section_summaries:
+                    st.markdown(f"**[{section['timestamp']}]** {section['summary']}")
+        
         # Show original content in expander
         with st.expander("📄 View Original Content"):
             content = st.session_state.current_content['content']
@@ -245,15 +332,27 @@ def render_summary_tab():
     # Regenerate option
     if st.button("🔄 Regenerate Summary"):
         with st.spinner("Regenerating..."):
-            orchestrator = ContentOrchestrator(
-                processing_mode=st.session_state.processing_mode
-            )
-            summary = orchestrator.generate_summary(
-                content=st.session_state.current_content['content'],
-                depth=st.session_state.summary_depth,
-                style=st.session_state.summary_style,
-                source_type=st.session_state.current_content['source_type']
-            )
+            orchestrator = get_current_orchestrator()
+            if st.session_state.current_section_summaries:
+                # Section summaries are kept, so only the synthesis reruns
+                stream = orchestrator.synthesize_sections(
+                    st.session_state.current_section_summaries,
+                    depth=st.session_state.summary_depth,
+                    style=st.session_state.summary_style,
+                    stream=True,
+                    use_cache=False
+                )
+            else:
+                stream = orchestrator.generate_summary(
+                    content=st.session_state.current_content['content'],
+                    depth=st.session_state.summary_depth,
+                    style=st.session_state.summary_style,
+                    source_type=st.session_state.current_content['source_type'],
+                    stream=True,
+                    token_count=st.session_state.current_content['metadata']['token_count'],
+                    use_cache=False
+                )
+            summary = st.write_stream(stream)
             st.session_state.current_summary = summary
             st.rerun()
 
@@ -263,9 +362,7 @@ def render_insights_tab():
     if not st.session_state.current_insights:
         if st.button("🔍 Generate Insights", type="primary"):
             with st.spinner("Extracting insights..."):
-                orchestrator = ContentOrchestrator(
-                    processing_mode=st.session_state.processing_mode
-                )
+                orchestrator = get_current_orchestrator()
                 insights = orchestrator.generate_insights(
                     st.session_state.current_content['content']
                 )
@@ -276,7 +373,12 @@ def render_insights_tab():
         st.markdown(st.session_state.current_insights)
         
         if st.button("🔄 Regenerate"):
-            st.session_state.current_insights = None
+            with st.spinner("Extracting insights..."):
+                orchestrator = get_current_orchestrator()
+                st.session_state.current_insights = orchestrator.generate_insights(
+                    st.session_state.current_content['content'],
+                    use_cache=False
+                )
             st.rerun()
 
 def render_questions_tab():
@@ -289,9 +391,7 @@ def render_questions_tab():
     
     if not st.session_state.current_questions or st.button("🔍 Generate Questions", type="primary"):
         with st.spinner("Generating questions..."):
-            orchestrator = ContentOrchestrator(
-                processing_mode=st.session_state.processing_mode
-            )
+            orchestrator = get_current_orchestrator()
             questions = orchestrator.generate_questions(
                 st.session_state.current_content['content'],
                 question_type
@@ -313,9 +413,7 @@ def render_transform_tab():
     
     if st.button("🔄 Transform", type="primary"):
         with st.spinner("Transforming content..."):
-            orchestrator = ContentOrchestrator(
-                processing_mode=st.session_state.processing_mode
-            )
+            orchestrator = get_current_orchestrator()
             transformed = orchestrator.transform_content(
                 st.session_state.current_content['content'],
                 transform_type
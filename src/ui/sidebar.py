@@ -4,6 +4,7 @@ Sidebar UI component
 
 import streamlit as st
 from src.config import Config
+from src.ui.pages import get_current_orchestrator
 
 def render_sidebar():
     """Render sidebar with settings and controls"""
@@ -44,6 +45,31 @@ def render_sidebar():
             index=Config.SUMMARY_STYLES.index(st.session_state.summary_style)
         )
         
+        # Bundle output must leave room for content in one call to the mode's model
+        bundle_available = Config.is_configured() and get_current_orchestrator().can_bundle(
+            st.session_state.summary_depth
+        )
+        st.session_state.bundle_mode = st.checkbox(
+            "Bundle Mode",
+            value=st.session_state.bundle_mode and bundle_available,
+            disabled=not bundle_available,
+            help=(
+                "Generate summary, insights and questions together in one LLM call"
+                if bundle_available else
+                "Not available: this model cannot fit all three outputs in one call at this depth"
+            )
+        )
+        
+        st.session_state.section_mode = st.checkbox(
+            "Timestamped Sections",
+            value=st.session_state.section_mode,
+            help=(
+                "Summarize YouTube videos section by section, showing each as it finishes. "
+                "Uses one call per section and skips compression and duplicate detection, "
+                "so long videos take more calls"
+            )
+        )
+        
         st.markdown("---")
         
         # Usage Stats
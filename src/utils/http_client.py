@@ -0,0 +1,129 @@
+"""
+Pooled HTTP client
+Keep-alive connections shared by every fetch, so repeated requests to a host
+skip DNS, TCP and TLS setup
+"""
+
+import queue
+import threading
+from contextlib import contextmanager
+from typing import Dict, Iterator, Optional
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.request import ACCEPT_ENCODING
+from urllib3.util.retry import Retry
+from src.config import Config
+
+class HTTPClient:
+    """
+    Thread-safe pool of requests.Session objects over one connection pool
+
+    Sessions (cookies, headers) are checked out per request, so threads never
+    share one; all of them mount the same HTTPAdapter, whose urllib3 pools
+    keep up to Config.HTTP_POOL_PER_HOST connections alive per host.
+    """
+
+    _shared: Optional["HTTPClient"] = None
+    _shared_lock = threading.Lock()
+
+    def __init__(self,
+                 pool_hosts: Optional[int] = None,
+                 pool_per_host: Optional[int] = None,
+                 connect_timeout: Optional[float] = None,
+                 read_timeout: Optional[float] = None):
+        """
+        Args:
+            pool_hosts: Hosts whose connection pools are kept
+            pool_per_host: Keep-alive connections per host (callers beyond this wait)
+            connect_timeout: Seconds to establish a connection
+            read_timeout: Seconds to wait between bytes of the response
+        """
+        self.timeout = (
+            Config.HTTP_CONNECT_TIMEOUT if connect_timeout is None else connect_timeout,
+            Config.HTTP_READ_TIMEOUT if read_timeout is None else read_timeout
+        )
+        self.adapter = HTTPAdapter(
+            pool_connections=pool_hosts or Config.HTTP_POOL_HOSTS,
+            pool_maxsize=pool_per_host or Config.HTTP_POOL_PER_HOST,
+            pool_block=True,
+            max_retries=Retry(
+                total=2,
+                backoff_factor=0.3,
+                status_forcelist=(502, 503, 504),
+                allowed_methods=("GET", "HEAD")
+            )
+        )
+        self.headers = {
+            'User-Agent': Config.HTTP_USER_AGENT,
+            # br is included only when brotli is installed (urllib3 can then decode it)
+            'Accept-Encoding': ACCEPT_ENCODING,
+            'Connection': 'keep-alive'
+        }
+
+        self._sessions = queue.LifoQueue()
+        self._stats_lock = threading.Lock()
+        self.requests_sent = 0
+
+    @classmethod
+    def get_shared(cls) -> "HTTPClient":
+        """Get the process-wide client"""
+        with cls._shared_lock:
+            if cls._shared is None:
+                cls._shared = cls()
+            return cls._shared
+
+    @contextmanager
+    def session(self) -> Iterator[requests.Session]:
+        """Check out a session for the duration of one request"""
+        try:
+            session = self._sessions.get_nowait()
+        except queue.Empty:
+            session = requests.Session()
+            session.headers.update(self.headers)
+            session.mount("http://", self.adapter)
+            session.mount("https://", self.adapter)
+
+        try:
+            yield session
+        finally:
+            self._sessions.put(session)
+
+    def get(self, url: str, **kwargs) -> requests.Response:
+        """GET with pooled connections and the configured timeouts"""
+        kwargs.setdefault("timeout", self.timeout)
+
+        with self.session() as session:
+            response = session.get(url, **kwargs)
+
+        with self._stats_lock:
+            self.requests_sent += 1
+
+        return response
+
+    def get_stats(self) -> Dict[str, float]:
+        """
+        Connection reuse across the live per-host pools
+
+        Counts come from urllib3 (connections opened, requests sent); pools
+        evicted beyond pool_hosts drop out of the totals.
+        """
+        pools = self.adapter.poolmanager.pools
+        connections = 0
+        pooled_requests = 0
+        hosts = 0
+
+        for key in pools.keys():
+            pool = pools.get(key)
+            if pool is not None:
+                hosts += 1
+                connections += pool.num_connections
+                pooled_requests += pool.num_requests
+
+        reused = max(0, pooled_requests - connections)
+        return {
+            "requests": self.requests_sent,
+            "hosts": hosts,
+            "connections_opened": connections,
+            "connections_reused": reused,
+            "reuse_rate": reused / pooled_requests if pooled_requests else 0.0
+        }
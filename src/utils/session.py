@@ -3,6 +3,7 @@ Session state management
 """
 
 import streamlit as st
+from src.config import Config
 
 def initialize_session_state():
     """Initialize all session state variables"""
@@ -30,6 +31,9 @@ def initialize_session_state():
     if 'current_transformation' not in st.session_state:
         st.session_state.current_transformation = None
     
+    if 'current_section_summaries' not in st.session_state:
+        st.session_state.current_section_summaries = None
+    
     # Settings state
     if 'summary_style' not in st.session_state:
         st.session_state.summary_style = "Executive Tone"
@@ -40,6 +44,12 @@ def initialize_session_state():
     if 'processing_mode' not in st.session_state:
         st.session_state.processing_mode = "Balanced"
     
+    if 'bundle_mode' not in st.session_state:
+        st.session_state.bundle_mode = Config.BUNDLE_MODE
+    
+    if 'section_mode' not in st.session_state:
+        st.session_state.section_mode = Config.SECTION_MODE
+    
     # Multi-URL comparison
     if 'comparison_urls' not in st.session_state:
         st.session_state.comparison_urls = []
@@ -58,6 +68,7 @@ def reset_content_state():
     st.session_state.current_insights = None
     st.session_state.current_questions = None
     st.session_state.current_transformation = None
+    st.session_state.current_section_summaries = None
     st.session_state.export_ready = False
 
 def add_processed_url(url: str):
@@ -3,7 +3,7 @@ URL validation and type detection utilities
 """
 
 import re
-from urllib.parse import urlparse
+from urllib.parse import urlparse, urlunparse, parse_qsl, urlencode
 from typing import Tuple, Optional
 
 class URLValidator:
@@ -51,6 +51,35 @@ class URLValidator:
         
         return 'website'
     
+    @classmethod
+    def canonicalize_url(cls, url: str) -> str:
+        """
+        Normalize URL so equivalent links share one cache entry
+        
+        YouTube links collapse to https://www.youtube.com/watch?v=ID; other
+        URLs get a lowercase scheme/host, no fragment and no utm_* parameters.
+        """
+        url = url.strip()
+        
+        video_id = cls.extract_video_id(url)
+        if video_id:
+            return f"https://www.youtube.com/watch?v={video_id}"
+        
+        parsed = urlparse(url)
+        query = [
+            (key, value) for key, value in parse_qsl(parsed.query, keep_blank_values=True)
+            if not key.lower().startswith('utm_')
+        ]
+        
+        return urlunparse((
+            parsed.scheme.lower(),
+            parsed.netloc.lower(),
+            parsed.path or '/',
+            parsed.params,
+            urlencode(query),
+            ''
+        ))
+    
     @classmethod
     def extract_video_id(cls, url: str) -> Optional[str]:
         """Extract YouTube video ID from URL"""
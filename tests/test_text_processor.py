@@ -0,0 +1,46 @@
+"""
+Chunk boundary tests for TextProcessor, with a word-level BPE standing in
+for cl100k_base (which attaches leading spaces to words the same way)
+"""
+
+import pytest
+import tiktoken
+
+from src.processors import text_processor
+from src.processors.text_processor import TextProcessor
+
+WORDS = ["Alpha", "beta", "gamma", "delta", "epsilon", "zeta", "eta", "theta"]
+SENTENCE = " ".join(WORDS) + "."
+
+def word_level_encoding() -> tiktoken.Encoding:
+    """Single bytes plus one token per word with and without a leading space"""
+    ranks = {bytes([i]): i for i in range(256)}
+    for word in WORDS:
+        for piece in (word.encode(), b" " + word.encode()):
+            for end in range(2, len(piece) + 1):
+                ranks.setdefault(piece[:end], len(ranks))
+    
+    return tiktoken.Encoding(
+        name="word-level-test",
+        pat_str=r"""'s|'t|'re|'ve|'m|'ll|'d| ?\p{L}+| ?\p{N}+| ?[^\s\p{L}\p{N}]+|\s+(?!\S)|\s+""",
+        mergeable_ranks=ranks,
+        special_tokens={}
+    )
+
+@pytest.fixture
+def make_processor(monkeypatch):
+    encoding = word_level_encoding()
+    monkeypatch.setattr(text_processor, "get_encoding", lambda name: encoding)
+    return lambda packing: TextProcessor(max_chunk_size=40, overlap=10, packing=packing)
+
+@pytest.mark.parametrize("packing", ["greedy", "optimal"])
+def test_chunks_end_and_start_at_sentence_boundaries(make_processor, packing):
+    processor = make_processor(packing)
+    assert len(processor.encoding.encode(" Alpha")) == 1
+    
+    chunks = processor.chunk_text(" ".join([SENTENCE] * 40))
+    
+    assert len(chunks) > 1
+    for chunk in chunks:
+        assert chunk['text'].startswith("Alpha ")
+        assert chunk['text'].endswith("theta.")